@@ -1,6 +1,95 @@
-from application import Application
-from screen import Screen
+import sys
+
+import constants
+
+
+def parse_args(argv: list[str]):
+    """Parse command line arguments.
+
+    `argparse` is only imported here so that `--version` never pays for it.
+    """
+    import argparse
+
+    from fill import FILL_LIMIT
+
+    parser = argparse.ArgumentParser(prog="cli", description="Draw to the terminal.")
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {constants.VERSION}",
+    )
+    parser.add_argument(
+        "-y",
+        "--yes",
+        action="store_true",
+        help="overwrite existing files on SAVE without asking",
+    )
+    parser.add_argument(
+        "--background-save",
+        action="store_true",
+        help="write saves on a background thread while drawing carries on",
+    )
+    parser.add_argument(
+        "--live",
+        metavar="NAME",
+        help="publish the drawing to shared memory NAME for `game --live NAME`",
+    )
+    parser.add_argument(
+        "--rle",
+        action="store_true",
+        help="store rows as runs of the same character, for large sparse drawings",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="DIR",
+        help="log commands and checkpoints to DIR and recover the drawing from it",
+    )
+    parser.add_argument(
+        "--tileset",
+        metavar="PATH",
+        default=constants.TILESET_PATH,
+        help="tileset description used by `SAVE <filename> TILES`",
+    )
+    parser.add_argument(
+        "--fill-limit",
+        metavar="N",
+        type=int,
+        default=FILL_LIMIT,
+        help="most spans FILL keeps waiting to be filled at once",
+    )
+    args = parser.parse_args(argv)
+    if args.fill_limit < 1:
+        parser.error("--fill-limit must be at least 1")
+    return args
+
 
 if __name__ == "__main__":
-    app = Application(Screen(10, 10), "x")
+    if "--version" in sys.argv[1:]:
+        print(f"cli {constants.VERSION}")
+        sys.exit()
+
+    # `--help` exits while parsing, before the application is imported.
+    args = parse_args(sys.argv[1:])
+
+    from application import Application
+    from canvas import Canvas
+
+    if args.rle:
+        from rle_screen import RunLengthScreen as screen_type
+    else:
+        from screen import Screen as screen_type
+
+    app = Application(
+        Canvas.blank(
+            10, 10, screen_type=screen_type, char="x", fill_limit=args.fill_limit
+        ),
+        confirm_overwrite=not args.yes,
+        background_save=args.background_save,
+        live_name=args.live,
+        tileset_path=args.tileset,
+    )
+    if args.journal:
+        from journal import Journal
+
+        app.start_journal(Journal(args.journal))
     app.run()
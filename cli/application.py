@@ -1,44 +1,95 @@
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Callable
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
 
 import constants
 from command import (
+    AutosaveCommand,
     ChangeCharCommand,
+    DiffCommand,
     ExitCommand,
     FillCommand,
     HelpCommand,
+    LayerAction,
+    LayerCommand,
     LineCommand,
+    LiveCommand,
     LoadCommand,
     NewCommand,
+    PatchCommand,
     RawCommand,
     RectangleCommand,
+    RegionCommand,
     SaveCommand,
     command_registry,
 )
-from exceptions import InvalidCommandException
-from screen import Screen
-from shapes import Line, Point, Rectangle, ShapeProtocol
+from exceptions import CanvasException, InvalidCommandException
+from glyphs import GLYPHS
+from shapes import Line, Point, Rectangle
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from canvas import Canvas, Region
+    from journal import Journal
+    from live import LivePublisher
+    from screen import ScreenProtocol
+    from writer import BackgroundWriter
 
 
 @dataclass
 class Application:
     """Application class for CLI.
 
+    Parses commands, applies them to a headless `Canvas` and prints the result.
+
     params:
-        screen: The screen object we are drawing too.
-        char: The character that will be drawn to the screen.
+        canvas: The canvas we are drawing too.
         error_message: An error message from the last tick.
+        info_message: An informational message from the last tick.
         should_print_help: A flag to indicate if a help message should be displayed.
         output: A sink for program output.  Defaults to python's `print` function.
+        input: A source of user input.  Defaults to python's `input` function.
+        confirm_overwrite: Ask before a save overwrites an existing file.
+        background_save: Write saves on a background thread from a snapshot of
+            the screen, so drawing can carry on while the file is written.
+        autosave_filename: File the drawing is periodically saved to.
+        autosave_interval: Seconds between autosaves.  Autosave is off when 0.
+        live_name: Name of a shared memory block the drawing is published to
+            after every command, for `game` to render live.
+        tileset_path: Tileset description used by `SAVE <filename> TILES`.
+        journal: Log of the commands applied, with checkpoints, that the drawing
+            can be recovered from after a crash.  Set with `start_journal`.
     """
 
-    screen: Screen
-    char: str = "x"
+    canvas: Canvas
     running: bool = True
     error_message: str = ""
+    info_message: str = ""
     should_print_help: bool = True
     output: Callable[[str], None] = print
+    input: Callable[[str], str] = input
+    confirm_overwrite: bool = True
+    background_save: bool = False
+    autosave_filename: str | None = None
+    autosave_interval: float = 0.0
+    live_name: str | None = None
+    tileset_path: str = constants.TILESET_PATH
+    writer: BackgroundWriter | None = field(init=False, default=None)
+    last_autosave: float = field(init=False, default_factory=time.monotonic)
+    publisher: LivePublisher | None = field(init=False, default=None)
+    journal: Journal | None = field(init=False, default=None)
+
+    @property
+    def screen(self) -> ScreenProtocol:
+        """The active layer of the canvas."""
+        return self.canvas.screen
+
+    @property
+    def char(self) -> str:
+        return self.canvas.char
 
     @staticmethod
     def parse_command(
@@ -59,8 +110,17 @@ class Application:
         self.output("LIN <x1> <y1> <x2> <y2>")
         self.output("REC <x1> <y1> <x2> <y2>")
         self.output("FILL <x> <y>")
-        self.output("SAVE <filename>")
-        self.output("LOAD <filename>")
+        self.output("SAVE <filename> [<x1> <y1> <x2> <y2>] [TILES]")
+        self.output("LOAD <filename> [AT <x> <y>]")
+        self.output("REGION [<x> <y>]")
+        self.output("LAYER <ADD|COPY|USE|DEL|HIDE|SHOW> <name>")
+        self.output("LAYER LIST")
+        self.output("AUTOSAVE <filename> <seconds>")
+        self.output("AUTOSAVE OFF")
+        self.output("LIVE <name>")
+        self.output("LIVE OFF")
+        self.output("DIFF <old_filename> <patch_filename>")
+        self.output("PATCH <patch_filename>")
         self.output("")
 
     def handle_command(self, command):
@@ -71,110 +131,242 @@ class Application:
         """
         match command:
             case NewCommand(w, h):
-                self.new_screen(w=w, h=h)
+                self.canvas.new(w=w, h=h)
             case ChangeCharCommand(c):
-                self.set_draw_character(character=c)
+                self.canvas.set_char(c)
             case LineCommand(x1, y1, x2, y2):
-                self.draw_shape(
+                self.canvas.draw(
                     Line(
                         Point(x1, y1),
                         Point(x2, y2),
                     ),
                 )
             case RectangleCommand(x1, y1, x2, y2):
-                self.draw_shape(
+                self.canvas.draw(
                     Rectangle(
                         Point(x1, y1),
                         Point(x2, y2),
                     )
                 )
             case FillCommand(x, y):
-                self.fill_area(x, y)
+                self.canvas.fill(x, y, progress=self.report_fill_progress)
             case HelpCommand():
                 self.should_print_help = True
-            case SaveCommand(filename):
-                self.save(filename)
-            case LoadCommand(filename):
-                self.load(filename)
+            case SaveCommand(filename, region, tiles):
+                self.save(filename, region, tiles)
+            case LoadCommand(filename, x, y):
+                self.load(filename, x, y)
+            case RegionCommand(x, y):
+                self.describe_region(x, y)
+            case LayerCommand(action, name):
+                self.handle_layer_command(action, name)
+            case AutosaveCommand(filename, interval):
+                self.autosave_filename = filename
+                self.autosave_interval = interval or 0.0
+                self.last_autosave = time.monotonic()
+            case LiveCommand(name):
+                self.live_name = name
+            case DiffCommand(old_filename, patch_filename):
+                self.diff(old_filename, patch_filename)
+            case PatchCommand(filename):
+                self.patch(filename)
             case ExitCommand():
                 self.running = False
 
-    def save(self, filename: str):
+        if self.journal is not None:
+            self.journal.record(command, self.canvas)
+
+    def start_journal(self, journal: Journal):
+        """Recover the drawing from a journal, then log commands to it.
+
+        params:
+            journal: The journal to recover from and log to.
+        """
+        commands = journal.recover(self.canvas)
+        for command in commands:
+            self.handle_command(command)
+
+        if journal.seq:
+            self.info_message = (
+                f"Recovered the drawing from {journal.directory}"
+                f" and replayed {len(commands)} commands."
+            )
+
+        journal.checkpoint(self.canvas)
+        self.journal = journal
+
+    def report_fill_progress(self, filled: int):
+        """Tell the user how far a long running fill has got."""
+        self.output(f"Filled {filled} cells so far.  Press Ctrl-C to cancel.")
+
+    def save(
+        self,
+        filename: str,
+        region: Region | None = None,
+        tiles: bool = False,
+    ):
         """Save a screen to a file.
 
-        If file already exists, user will be prompted to overwrite.
+        If file already exists, user will be prompted to overwrite unless
+        `confirm_overwrite` is off.
 
         params:
             filename: Path to save file to.
+            region: Corners of the part of the screen to save as
+                (x1, y1, x2, y2).  The whole screen is saved if not given.
+            tiles: Save a level of tile indices for the game instead of text.
         """
+        from pathlib import Path
+
         path = Path(filename)
-        if path.exists():
-            answer = input(f"{path} already exists.  Overwrite? [y, n] > ")
-            if answer.upper() not in ("Y", "YES"):
-                self.output("Save aborted.")
-                return
+        if not self.may_overwrite(path):
+            self.output("Save aborted.")
+            return
+
+        if tiles:
+            from tiles import Tileset
+
+            tileset = Tileset.load(Path(self.tileset_path))
+            self.canvas.save_tiles(path, tileset, region)
+            self.output("Save successfull.")
+            return
+
+        if self.background_save:
+            self.save_in_background(path, region)
+            self.output("Saving in the background.")
+            return
 
-        with path.open("w") as f:
-            f.writelines(("".join(line) + "\n" for line in self.screen.buffer))
+        self.canvas.save(path, region)
 
         self.output("Save successfull.")
 
-    def load(self, filename: str):
+    def may_overwrite(self, path: Path) -> bool:
+        """Ask before a file is overwritten, unless `confirm_overwrite` is off."""
+        if not path.exists() or not self.confirm_overwrite:
+            return True
+
+        answer = self.input(f"{path} already exists.  Overwrite? [y, n] > ")
+        return answer.upper() in ("Y", "YES")
+
+    def save_in_background(
+        self,
+        path: Path,
+        region: Region | None = None,
+    ):
+        """Queue a snapshot of the screen to be saved on the writer thread."""
+        if self.writer is None:
+            from writer import BackgroundWriter
+
+            self.writer = BackgroundWriter()
+
+        self.writer.submit(path, self.canvas.lines(region, snapshot=True))
+
+    def load(self, filename: str, x: int | None = None, y: int | None = None):
         """Load a screen from a file.
 
         params:
             filename: Path to file to load.
+            x: Column to paste the file at.  The file replaces the screen if
+                no position is given.
+            y: Row to paste the file at.
         """
+        from pathlib import Path
+
         path = Path(filename)
         if not path.exists():
             self.output(f"{path} does not exist.")
+            return
 
         if not path.is_file():
             self.output(f"{path} is not a file.")
+            return
+
+        if x is not None and y is not None:
+            self.canvas.paste(path, x, y)
+        else:
+            try:
+                self.canvas.load(path)
+            except CanvasException as e:
+                self.output(f"{e}  Abort.")
+                return
+
+        self.output("Load Successfull.")
 
-        raw_data: list[list[str]] = []
-        with path.open("r") as f:
-            for i, line in enumerate(f.readlines()):
-                raw_data.append([c for c in line.rstrip("\n")])
+    def diff(self, old_filename: str, patch_filename: str):
+        """Save the changes from a saved drawing to the current one as a patch.
 
-        if not raw_data:
-            self.output("File was empty.  Abort.")
+        params:
+            old_filename: Path of the saved drawing to compare against.
+            patch_filename: Path to save the patch to.
+        """
+        from pathlib import Path
+
+        from diff import write_patch
+
+        old_path, patch_path = Path(old_filename), Path(patch_filename)
+        if not old_path.is_file():
+            self.output(f"{old_path} is not a file.")
+            return
+
+        if not self.may_overwrite(patch_path):
+            self.output("Diff aborted.")
             return
 
-        h = len(raw_data)
-        w = len(raw_data[0])
-        self.new_screen(w=w, h=h)
+        patch = self.canvas.diff_file(old_path)
+        write_patch(patch_path, patch)
+        self.output(f"Saved {len(patch.changes)} changed spans to {patch_path}.")
 
-        for y, line in enumerate(raw_data):
-            for x, c in enumerate(line):
-                self.screen.put_char(c, x, y)
+    def patch(self, filename: str):
+        """Apply a patch saved by DIFF to the active layer.
 
-        self.output("Load Successfull.")
+        params:
+            filename: Path of the patch.
+        """
+        from pathlib import Path
+
+        from diff import read_patch
+
+        path = Path(filename)
+        if not path.is_file():
+            self.output(f"{path} is not a file.")
+            return
+
+        self.canvas.apply_patch(read_patch(path))
+        self.output("Patch applied.")
 
     def print_screen(self):
-        """Print screen with the application output function."""
-        top_nums = "│".join(str(i % 10) for i in range(self.screen.w))
-        header = "╤".join(c for c in "═" * self.screen.w)
-        mid = "┼".join(c for c in "─" * self.screen.w)
-        bottom = "╧".join(c for c in "═" * self.screen.w)
+        """Print screen with the application output function.
+
+        Every cell is padded to the display width of the widest glyph on the
+        screen, so wide characters such as emoji keep the grid aligned.
+        """
+        screen = self.canvas.composite()
+        rows = [screen.cells(y) for y in range(screen.h)]
+        width = max((GLYPHS.width(c) for cells in rows for c in cells), default=1)
+
+        top_nums = "│".join(str(i % 10).ljust(width) for i in range(screen.w))
+        header = "╤".join("═" * width for _ in range(screen.w))
+        mid = "┼".join("─" * width for _ in range(screen.w))
+        bottom = "╧".join("═" * width for _ in range(screen.w))
 
         self.output("│" + top_nums + "│")
         self.output("╔" + header + "╗")
 
-        last_line = len(self.screen.buffer) - 1
-        for i, line in enumerate(self.screen.buffer):
-            self.output("║" + "│".join(line) + f"║ {i}")
+        last_line = screen.h - 1
+        for i, cells in enumerate(rows):
+            line = "│".join(c + " " * (width - GLYPHS.width(c)) for c in cells)
+            self.output("║" + line + f"║ {i}")
             if i < last_line:
                 self.output("╟" + mid + "╢")
 
         self.output("╚" + bottom + "╝")
 
     def handle_user_input(self):
-        command_from_input = input("> ")
+        command_from_input = self.input("> ")
         try:
             command = self.parse_command(command_from_input)
             self.handle_command(command=command)
-        except InvalidCommandException as e:
+        except (InvalidCommandException, CanvasException) as e:
             self.error_message = str(e)
 
     def print_system_messages(self):
@@ -186,56 +378,126 @@ class Application:
             self.output("error: ", self.error_message)
             self.error_message = ""
 
+        if self.info_message:
+            self.output(self.info_message)
+            self.info_message = ""
+
+        if self.writer is not None:
+            for path, error in self.writer.results():
+                if error is None:
+                    self.output(f"Saved {path}.")
+                else:
+                    self.output("error: ", f"Saving {path} failed. {error}")
+
+    def autosave(self):
+        """Save to the autosave file if the autosave interval has passed."""
+        if not self.autosave_filename or self.autosave_interval <= 0:
+            return
+
+        now = time.monotonic()
+        if now - self.last_autosave < self.autosave_interval:
+            return
+
+        self.last_autosave = now
+        if self.background_save:
+            from pathlib import Path
+
+            self.save_in_background(Path(self.autosave_filename))
+            return
+
+        try:
+            self.canvas.save(self.autosave_filename)
+        except OSError as e:
+            self.error_message = f"Autosave to {self.autosave_filename} failed. {e}"
+
+    def publish_live(self):
+        """Publish the drawing to shared memory if live preview is on."""
+        if self.publisher is not None and self.publisher.name != self.live_name:
+            self.publisher.close()
+            self.publisher = None
+
+        if self.live_name is None:
+            return
+
+        if self.publisher is None:
+            from live import LivePublisher
+
+            self.publisher = LivePublisher(self.live_name)
+
+        try:
+            self.publisher.publish(self.canvas.composite())
+        except CanvasException as e:
+            self.error_message = f"Live preview stopped. {e}"
+            self.live_name = None
+            self.publisher = None
+
     def run(self):
         """Run the CLI."""
         while self.running:
             try:
+                self.publish_live()
                 self.output(constants.CLEAR_SCREEN)
                 self.print_screen()
                 self.print_system_messages()
                 self.handle_user_input()
+                self.autosave()
             except KeyboardInterrupt:
                 self.running = False
 
-    def new_screen(self, w: int, h: int):
-        self.screen = Screen(w, h)
-
-    def set_draw_character(self, character: str):
-        self.char = character
-
-    def draw_shape(self, shape: ShapeProtocol):
-        for p in shape.points():
-            self.screen.put_char(self.char, p.x, p.y)
-
-    def __fill(self, x: int, y: int, c_to_replace: str):
-        c = self.screen.buffer[y][x]
-        if c != c_to_replace:
-            return
-
-        self.screen.put_char(c=self.char, x=x, y=y)
-        if self.screen.w > x + 1:  # Right
-            self.__fill(x=x + 1, y=y, c_to_replace=c_to_replace)
+        if self.writer is not None:
+            self.writer.close()
 
-        if 0 <= x - 1:  # Left
-            self.__fill(x=x - 1, y=y, c_to_replace=c_to_replace)
+        if self.publisher is not None:
+            self.publisher.close()
 
-        if self.screen.h > y + 1:  # Below
-            self.__fill(x=x, y=y + 1, c_to_replace=c_to_replace)
+        if self.journal is not None:
+            self.journal.checkpoint(self.canvas)
+            self.journal.close()
 
-        if 0 <= y - 1:  # Above
-            self.__fill(x=x, y=y - 1, c_to_replace=c_to_replace)
+    def describe_region(self, x: int | None, y: int | None):
+        """Report region sizes, indexing the screen if it is not already.
 
-        return
+        params:
+            x: Column of a cell in the region to describe.
+            y: Row of a cell in the region to describe.
+        """
+        if x is None or y is None:
+            sizes = self.canvas.region_sizes()
+            self.info_message = (
+                f"{len(sizes)} regions.  Largest has {sizes[0] if sizes else 0} cells."
+            )
+            return
 
-    def fill_area(self, x: int, y: int):
-        max_x = self.screen.w - 1  # zero indexed
-        max_y = self.screen.h - 1  # zero indexed
+        size = self.canvas.region_size(x, y)
+        self.info_message = (
+            f"Region at ({x}, {y}) of '{self.screen.get_char(x, y)}' has {size} cells."
+        )
 
-        if max_x < x or max_y < y:
-            raise InvalidCommandException("Fill position is off screen.")
+    def handle_layer_command(self, action: LayerAction, name: str | None):
+        """Manage the layer stack.
 
-        self.__fill(
-            x=x,
-            y=y,
-            c_to_replace=self.screen.buffer[y][x],
-        )
+        params:
+            action: What to do to the layer.
+            name: Name of the layer.  Unused when listing layers.
+        """
+        layers = self.canvas.layers
+        match action:
+            case LayerAction.ADD:
+                self.canvas.add_layer(name)
+            case LayerAction.COPY:
+                self.canvas.copy_layer(name)
+            case LayerAction.USE:
+                self.canvas.use_layer(name)
+            case LayerAction.DEL:
+                self.canvas.remove_layer(name)
+            case LayerAction.HIDE:
+                self.canvas.set_layer_visible(name, False)
+            case LayerAction.SHOW:
+                self.canvas.set_layer_visible(name, True)
+            case LayerAction.LIST:
+                self.info_message = "Layers (bottom to top): " + ", ".join(
+                    ("*" if n == layers.active else "")
+                    + n
+                    + (" (hidden)" if n in layers.hidden else "")
+                    for n in layers.layers
+                )
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from exceptions import CanvasException
+from fill import FILL_LIMIT, scanline_fill
+from layers import LayerStack
+from screen import Screen, ScreenProtocol
+from shapes import Line, Point, Rectangle, ShapeProtocol
+
+if TYPE_CHECKING:
+    from os import PathLike
+
+    from diff import Patch
+    from regions import RegionIndex
+    from tiles import Tileset
+
+Region = tuple[int, int, int, int]
+
+
+class Canvas:
+    """Headless drawing API.
+
+    A canvas owns the layers of a drawing and the character used to draw.  It
+    never formats output, so it can be scripted from python directly; the CLI's
+    `Application` is a thin wrapper that parses commands and prints the result.
+
+    params:
+        screen: The bottom layer of the drawing.  New layers and drawings use
+            the same storage, e.g. `Screen` or `RunLengthScreen`.
+        char: The character that will be drawn.
+        region_index: Keep a connected region index for every layer so that
+            repeated fills relabel known regions instead of rescanning them.
+        fill_limit: Most spans a fill keeps waiting to be filled at once.
+            Filled cells are still marked with a bit each.  See
+            `fill.scanline_fill`.
+    """
+
+    def __init__(
+        self,
+        screen: ScreenProtocol,
+        char: str = "x",
+        region_index: bool = False,
+        fill_limit: int = FILL_LIMIT,
+    ):
+        self.char = char
+        self.region_index = region_index
+        self.fill_limit = fill_limit
+        self.screen_type: type[ScreenProtocol] = type(screen)
+        self._reset(screen)
+
+    @classmethod
+    def blank(
+        cls,
+        w: int,
+        h: int,
+        screen_type: type[ScreenProtocol] = Screen,
+        **kwargs,
+    ) -> Canvas:
+        """Create a canvas with a blank screen of the given size and storage."""
+        return cls(screen_type(w, h), **kwargs)
+
+    @property
+    def screen(self) -> ScreenProtocol:
+        """The active layer, which drawing goes to."""
+        return self.layers.screen
+
+    @property
+    def w(self) -> int:
+        return self.screen.w
+
+    @property
+    def h(self) -> int:
+        return self.screen.h
+
+    def _reset(self, screen: ScreenProtocol):
+        if self.region_index:
+            self.index(screen)
+        self.layers = LayerStack(screen)
+
+    def _check_on_screen(self, x: int, y: int, what: str):
+        if not (0 <= x < self.w and 0 <= y < self.h):
+            raise CanvasException(f"{what} position is off screen.")
+
+    def restore(self, layers: LayerStack, char: str):
+        """Replace the drawing with a stack of layers, e.g. from a checkpoint."""
+        if self.region_index:
+            for screen in layers.layers.values():
+                self.index(screen)
+        self.layers = layers
+        self.char = char
+
+    def new(self, w: int, h: int):
+        """Replace the drawing with a blank one of the given size."""
+        self._reset(self.screen_type(w, h))
+
+    def set_char(self, c: str):
+        self.char = c
+
+    def draw(self, shape: ShapeProtocol, char: str | None = None):
+        """Draw a shape to the active layer.
+
+        params:
+            shape: The shape to draw.
+            char: Character to draw with.  Defaults to the canvas character.
+        """
+        c = self.char if char is None else char
+        for span in shape.spans():
+            self.screen.fill_span(c, span.x1, span.x2, span.y)
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, char: str | None = None):
+        self.draw(Line(Point(x1, y1), Point(x2, y2)), char)
+
+    def rectangle(self, x1: int, y1: int, x2: int, y2: int, char: str | None = None):
+        self.draw(Rectangle(Point(x1, y1), Point(x2, y2)), char)
+
+    def fill(
+        self,
+        x: int,
+        y: int,
+        char: str | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> int:
+        """Fill the area connected to (x, y) that has the same character.
+
+        A KeyboardInterrupt while filling, e.g. from Ctrl-C, puts the active
+        layer back as it was and raises a `CanvasException`.
+
+        Returns the number of cells filled.
+
+        params:
+            x: Column to fill from.
+            y: Row to fill from.
+            char: Character to fill with.  Defaults to the canvas character.
+            progress: Called with the number of cells filled so far while a
+                large fill runs.
+        """
+        self._check_on_screen(x, y, "Fill")
+        c = self.char if char is None else char
+
+        region_index = self.screen.region_index
+        try:
+            if region_index is not None:
+                size = region_index.size(x, y)
+                region_index.fill(x, y, c, progress)
+                return size
+            return scanline_fill(self.screen, x, y, c, self.fill_limit, progress)
+        except KeyboardInterrupt:
+            # Both fills undo what they wrote before letting it through.
+            raise CanvasException(
+                "Fill cancelled.  The drawing is unchanged."
+            ) from None
+
+    @staticmethod
+    def index(screen: ScreenProtocol) -> RegionIndex:
+        """Get the region index of a screen, building it if needed."""
+        if screen.region_index is not None:
+            return screen.region_index
+
+        from regions import RegionIndex
+
+        return RegionIndex(screen)
+
+    def region_size(self, x: int, y: int) -> int:
+        """Count the cells in the region containing (x, y) on the active layer."""
+        self._check_on_screen(x, y, "Region")
+        return self.index(self.screen).size(x, y)
+
+    def region_sizes(self) -> list[int]:
+        """Sizes of every region on the active layer, largest first."""
+        return self.index(self.screen).sizes()
+
+    def _layer_changed(self):
+        if self.region_index:
+            self.index(self.screen)
+
+    def add_layer(self, name: str):
+        """Add an empty layer on top and make it active."""
+        self.layers.add(name)
+        self._layer_changed()
+
+    def copy_layer(self, name: str):
+        """Add a copy-on-write snapshot of the active layer and make it active."""
+        self.layers.copy(name)
+        self._layer_changed()
+
+    def use_layer(self, name: str):
+        self.layers.use(name)
+        self._layer_changed()
+
+    def remove_layer(self, name: str):
+        self.layers.remove(name)
+        self._layer_changed()
+
+    def set_layer_visible(self, name: str, visible: bool):
+        self.layers.set_visible(name, visible)
+
+    def composite(self) -> ScreenProtocol:
+        """Flatten the visible layers.  The result must not be drawn to."""
+        return self.layers.composite()
+
+    def lines(
+        self,
+        region: Region | None = None,
+        snapshot: bool = False,
+    ) -> Iterator[str]:
+        """Lines of text for the whole drawing or a region of it.
+
+        params:
+            region: Corners of the part of the drawing to return as
+                (x1, y1, x2, y2).  The whole drawing is returned if not given.
+            snapshot: Produce the lines from a snapshot, so the drawing can
+                change while the lines are consumed, e.g. on another thread.
+        """
+        screen = self.composite()
+        if snapshot:
+            screen = screen.snapshot()
+
+        if region is None:
+            return screen.rows()
+
+        x1, y1, x2, y2 = region
+        min_x, max_x = max(min(x1, x2), 0), min(max(x1, x2), screen.w - 1)
+        min_y, max_y = max(min(y1, y2), 0), min(max(y1, y2), screen.h - 1)
+        if min_x > max_x or min_y > max_y:
+            raise CanvasException("Region is off screen.")
+
+        return (
+            "".join(screen.cells(y)[min_x : max_x + 1])
+            for y in range(min_y, max_y + 1)
+        )
+
+    def to_bytes(self, region: Region | None = None) -> bytes:
+        """Encode the drawing, or a region of it, as it would be saved."""
+        return "".join(line + "\n" for line in self.lines(region)).encode()
+
+    def save(self, path: str | PathLike, region: Region | None = None):
+        """Save the drawing, or a region of it, to a file."""
+        from pathlib import Path
+
+        from storage import write_lines
+
+        write_lines(Path(path), self.lines(region))
+
+    def save_tiles(
+        self,
+        path: str | PathLike,
+        tileset: Tileset,
+        region: Region | None = None,
+    ):
+        """Save the drawing, or a region of it, as a tile level for the game.
+
+        params:
+            path: File to save to.
+            tileset: Tileset that maps the characters to tile indices.
+            region: Corners of the part of the drawing to save as
+                (x1, y1, x2, y2).  The whole drawing is saved if not given.
+        """
+        from pathlib import Path
+
+        from storage import write_bytes
+        from tiles import encode_level
+
+        write_bytes(Path(path), encode_level(self.lines(region), tileset))
+
+    def load(self, path: str | PathLike):
+        """Replace the drawing with the contents of a file."""
+        from pathlib import Path
+
+        from glyphs import graphemes
+        from storage import read_lines
+
+        raw_data = [graphemes(line) for line in read_lines(Path(path))]
+        if not raw_data:
+            raise CanvasException("File was empty.")
+
+        screen = self.screen_type(len(raw_data[0]), len(raw_data))
+        for y, line in enumerate(raw_data):
+            for x, c in enumerate(line):
+                screen.put_char(c, x, y)
+        self._reset(screen)
+
+    def diff_file(self, path: str | PathLike) -> Patch:
+        """Find the changes that turn a saved drawing into this one."""
+        from pathlib import Path
+
+        from diff import diff_lines
+        from storage import read_lines
+
+        return diff_lines(read_lines(Path(path)), list(self.lines()))
+
+    def apply_patch(self, patch: Patch):
+        """Apply a patch to the active layer.
+
+        A patch that resizes the drawing can only be applied to a drawing with
+        a single layer.
+        """
+        from diff import apply_patch
+
+        if patch.new_size != patch.old_size and len(self.layers.layers) > 1:
+            raise CanvasException("Can not resize a drawing with more than one layer.")
+
+        screen = apply_patch(self.screen, patch)
+        if screen is not self.screen:
+            self._reset(screen)
+
+    def paste(self, path: str | PathLike, x: int, y: int):
+        """Paste a file onto the active layer with its top left corner at (x, y).
+
+        Only the part of the file that lands on the screen is read.
+        """
+        self._check_on_screen(x, y, "Paste")
+
+        from pathlib import Path
+
+        from glyphs import graphemes
+        from storage import read_block
+
+        block = read_block(Path(path), cols=self.w - x, rows=self.h - y)
+        for dy, line in enumerate(block):
+            for dx, c in enumerate(graphemes(line)):
+                self.screen.put_char(c, x + dx, y + dy)
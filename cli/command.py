@@ -6,6 +6,7 @@ from enum import StrEnum
 from typing import Protocol
 
 from exceptions import InvalidCommandException
+from glyphs import graphemes
 
 
 class CommandOptions(StrEnum):
@@ -18,6 +19,22 @@ class CommandOptions(StrEnum):
     SAVE = "SAVE"
     LOAD = "LOAD"
     EXIT = "EXIT"
+    REGION = "REGION"
+    LAYER = "LAYER"
+    AUTOSAVE = "AUTOSAVE"
+    LIVE = "LIVE"
+    DIFF = "DIFF"
+    PATCH = "PATCH"
+
+
+class LayerAction(StrEnum):
+    ADD = "ADD"
+    COPY = "COPY"
+    USE = "USE"
+    DEL = "DEL"
+    HIDE = "HIDE"
+    SHOW = "SHOW"
+    LIST = "LIST"
 
 
 @dataclass(frozen=True)
@@ -85,7 +102,7 @@ class ChangeCharCommand:
         raw_command: RawCommand,
     ) -> ChangeCharCommand:
         try:
-            c = raw_command.params[0][0]
+            c = graphemes(raw_command.params[0])[0]
         except IndexError as e:
             raise InvalidCommandException("Missing parameters for CHA command.") from e
 
@@ -204,6 +221,8 @@ class ExitCommand:
 @dataclass
 class SaveCommand:
     filename: str
+    region: tuple[int, int, int, int] | None = None
+    tiles: bool = False
 
     @classmethod
     def from_raw_command(
@@ -211,16 +230,37 @@ class SaveCommand:
         raw_command: RawCommand,
     ) -> SaveCommand:
         try:
-            filename, *_ = raw_command.params
+            filename, *region = raw_command.params
         except ValueError as e:
             raise InvalidCommandException("Missing parameters for SAVE command.") from e
 
-        return cls(filename)
+        tiles = bool(region) and region[-1].upper() == "TILES"
+        if tiles:
+            region = region[:-1]
+
+        if not region:
+            return cls(filename, tiles=tiles)
+
+        if len(region) != 4:
+            raise InvalidCommandException(
+                "SAVE command takes a region as <x1> <y1> <x2> <y2>."
+            )
+
+        try:
+            x1, y1, x2, y2 = [int(value) for value in region]
+        except ValueError as e:
+            raise InvalidCommandException(
+                "Region for SAVE command must be integers."
+            ) from e
+
+        return cls(filename, region=(x1, y1, x2, y2), tiles=tiles)
 
 
 @dataclass
 class LoadCommand:
     filename: str
+    x: int | None = None
+    y: int | None = None
 
     @classmethod
     def from_raw_command(
@@ -228,11 +268,172 @@ class LoadCommand:
         raw_command: RawCommand,
     ) -> LoadCommand:
         try:
-            filename, *_ = raw_command.params
+            filename, *position = raw_command.params
         except ValueError as e:
             raise InvalidCommandException("Missing parameters for LOAD command.") from e
 
-        return cls(filename)
+        if not position:
+            return cls(filename)
+
+        try:
+            at, x, y = position
+            if at.upper() != "AT":
+                raise ValueError(at)
+            x, y = int(x), int(y)
+        except ValueError as e:
+            raise InvalidCommandException(
+                "LOAD command takes a position as AT <x> <y>."
+            ) from e
+
+        return cls(filename, x=x, y=y)
+
+
+@dataclass
+class RegionCommand:
+    x: int | None = None
+    y: int | None = None
+
+    @classmethod
+    def from_raw_command(
+        cls: type[RegionCommand],
+        raw_command: RawCommand,
+    ) -> RegionCommand:
+        if not raw_command.params:
+            return cls()
+
+        try:
+            x, y = raw_command.params
+        except ValueError as e:
+            raise InvalidCommandException(
+                "REGION command takes either no parameters or <x> <y>."
+            ) from e
+
+        try:
+            x, y = [int(value) for value in [x, y]]
+        except ValueError as e:
+            raise InvalidCommandException(
+                "Parameters for REGION command must be integers."
+            ) from e
+
+        return cls(x=x, y=y)
+
+
+@dataclass
+class LayerCommand:
+    action: LayerAction
+    name: str | None = None
+
+    @classmethod
+    def from_raw_command(
+        cls: type[LayerCommand],
+        raw_command: RawCommand,
+    ) -> LayerCommand:
+        try:
+            action, *params = raw_command.params
+            action = LayerAction(action.upper())
+        except ValueError as e:
+            raise InvalidCommandException(
+                f"LAYER command needs one of {', '.join(LayerAction)}."
+            ) from e
+
+        if action == LayerAction.LIST:
+            return cls(action=action)
+
+        try:
+            (name,) = params
+        except ValueError as e:
+            raise InvalidCommandException(f"LAYER {action} needs a layer name.") from e
+
+        return cls(action=action, name=name)
+
+
+@dataclass
+class AutosaveCommand:
+    filename: str | None = None
+    interval: float | None = None
+
+    @classmethod
+    def from_raw_command(
+        cls: type[AutosaveCommand],
+        raw_command: RawCommand,
+    ) -> AutosaveCommand:
+        match raw_command.params:
+            case [off] if off.upper() == "OFF":
+                return cls()
+            case [filename, interval]:
+                try:
+                    interval = float(interval)
+                except ValueError as e:
+                    raise InvalidCommandException(
+                        "Interval for AUTOSAVE command must be a number of seconds."
+                    ) from e
+
+                if interval <= 0:
+                    raise InvalidCommandException(
+                        "Interval for AUTOSAVE command must be positive."
+                    )
+
+                return cls(filename=filename, interval=interval)
+            case _:
+                raise InvalidCommandException(
+                    "AUTOSAVE command takes <filename> <seconds> or OFF."
+                )
+
+
+@dataclass
+class LiveCommand:
+    name: str | None = None
+
+    @classmethod
+    def from_raw_command(
+        cls: type[LiveCommand],
+        raw_command: RawCommand,
+    ) -> LiveCommand:
+        try:
+            (name,) = raw_command.params
+        except ValueError as e:
+            raise InvalidCommandException("LIVE command takes <name> or OFF.") from e
+
+        return cls() if name.upper() == "OFF" else cls(name=name)
+
+
+@dataclass
+class DiffCommand:
+    old_filename: str
+    patch_filename: str
+
+    @classmethod
+    def from_raw_command(
+        cls: type[DiffCommand],
+        raw_command: RawCommand,
+    ) -> DiffCommand:
+        try:
+            old_filename, patch_filename = raw_command.params
+        except ValueError as e:
+            raise InvalidCommandException(
+                "DIFF command takes <old_filename> <patch_filename>."
+            ) from e
+
+        return cls(old_filename=old_filename, patch_filename=patch_filename)
+
+
+@dataclass
+class PatchCommand:
+    filename: str
+
+    @classmethod
+    def from_raw_command(
+        cls: type[PatchCommand],
+        raw_command: RawCommand,
+    ) -> PatchCommand:
+        try:
+            (filename,) = raw_command.params
+        except ValueError as e:
+            raise InvalidCommandException(
+                "PATCH command takes <patch_filename>."
+            ) from e
+
+        return cls(filename=filename)
 
 
 command_registry = defaultdict(
@@ -247,5 +448,11 @@ command_registry = defaultdict(
         CommandOptions.SAVE: SaveCommand,
         CommandOptions.LOAD: LoadCommand,
         CommandOptions.EXIT: ExitCommand,
+        CommandOptions.REGION: RegionCommand,
+        CommandOptions.LAYER: LayerCommand,
+        CommandOptions.AUTOSAVE: AutosaveCommand,
+        CommandOptions.LIVE: LiveCommand,
+        CommandOptions.DIFF: DiffCommand,
+        CommandOptions.PATCH: PatchCommand,
     },
 )
@@ -1 +1,3 @@
+VERSION = "0.1.0"
 CLEAR_SCREEN = "\033[2J"
+TILESET_PATH = "./resources/map_tileset.json"
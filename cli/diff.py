@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from exceptions import CanvasException
+from glyphs import graphemes
+from screen import ScreenProtocol
+from storage import read_lines, write_lines
+
+PATCH_MAGIC = "TDPATCH 1"
+# Unchanged cells between two changes on a row are included in one span when
+# there are at most this many, rather than starting a new span.
+MERGE_GAP = 4
+
+
+@dataclass(frozen=True)
+class Change:
+    """New cells for part of a row, starting at column x."""
+
+    y: int
+    x: int
+    text: str
+
+
+@dataclass
+class Patch:
+    """The changes that turn one drawing into another.
+
+    params:
+        old_size: Width and height of the drawing the patch applies to.
+        new_size: Width and height of the drawing after the patch.
+        changes: Changed spans, in row order.
+    """
+
+    old_size: tuple[int, int]
+    new_size: tuple[int, int]
+    changes: list[Change] = field(default_factory=list)
+
+
+def _row_changes(y: int, old: list[str], new: list[str]) -> Iterator[Change]:
+    """Spans of row y that differ between the old and new cells of the row.
+
+    `old` may be shorter or longer than `new`.  Missing cells count as blank.
+    """
+    start = end = None
+    for x, c in enumerate(new):
+        if c == (old[x] if x < len(old) else " "):
+            continue
+        if end is not None and x - end > MERGE_GAP:
+            yield Change(y, start, "".join(new[start:end]))
+            start = None
+        if start is None:
+            start = x
+        end = x + 1
+
+    if start is not None:
+        yield Change(y, start, "".join(new[start:end]))
+
+
+def _diff(
+    old_size: tuple[int, int],
+    new_size: tuple[int, int],
+    rows_equal: Iterable[bool],
+    old_cells,
+    new_cells,
+) -> Patch:
+    patch = Patch(old_size, new_size)
+    for y, equal in enumerate(rows_equal):
+        if equal:
+            continue
+        old = old_cells(y) if y < old_size[1] else []
+        patch.changes.extend(_row_changes(y, old, new_cells(y)))
+    return patch
+
+
+def diff_screens(old: ScreenProtocol, new: ScreenProtocol) -> Patch:
+    """Find the changes that turn screen `old` into screen `new`.
+
+    Rows are compared whole on their storage first, which is shared between
+    snapshots and compared in C otherwise, and only rows that differ are
+    compared a cell at a time.
+    """
+    same_storage = type(old) is type(new) and old.w == new.w
+
+    def rows_equal():
+        for y in range(new.h):
+            if y >= old.h:
+                yield False
+            elif same_storage:
+                a, b = old.raw_row(y), new.raw_row(y)
+                yield a is b or a == b
+            else:
+                yield old.row(y) == new.row(y)
+
+    return _diff((old.w, old.h), (new.w, new.h), rows_equal(), old.cells, new.cells)
+
+
+def _size(lines: list[str]) -> tuple[int, int]:
+    return (len(graphemes(lines[0])) if lines else 0, len(lines))
+
+
+def diff_lines(old: list[str], new: list[str]) -> Patch:
+    """Find the changes that turn the lines of one drawing into another's."""
+    old_size, new_size = _size(old), _size(new)
+    return _diff(
+        old_size,
+        new_size,
+        (y < len(old) and old[y] == line for y, line in enumerate(new)),
+        lambda y: graphemes(old[y]),
+        lambda y: graphemes(new[y]),
+    )
+
+
+def diff_files(old: Path, new: Path) -> Patch:
+    """Find the changes that turn one saved drawing into another."""
+    return diff_lines(read_lines(old), read_lines(new))
+
+
+def format_patch(patch: Patch) -> Iterator[str]:
+    """Lines of the text form of a patch.
+
+    After a magic line and the sizes, every change is written as `y x text`.
+    """
+    yield PATCH_MAGIC
+    yield "SIZE {} {} {} {}".format(*patch.old_size, *patch.new_size)
+    for change in patch.changes:
+        yield f"{change.y} {change.x} {change.text}"
+
+
+def parse_patch(lines: Iterable[str]) -> Patch:
+    """Read a patch from the lines of its text form."""
+    lines = iter(lines)
+    if next(lines, None) != PATCH_MAGIC:
+        raise CanvasException("Not a patch file.")
+
+    try:
+        kind, *sizes = next(lines).split(" ")
+        old_w, old_h, new_w, new_h = (int(size) for size in sizes)
+        if kind != "SIZE":
+            raise ValueError(kind)
+
+        patch = Patch((old_w, old_h), (new_w, new_h))
+        for line in lines:
+            y, x, text = line.split(" ", 2)
+            patch.changes.append(Change(int(y), int(x), text))
+    except (StopIteration, ValueError) as e:
+        raise CanvasException("Patch file is damaged.") from e
+
+    return patch
+
+
+def write_patch(path: Path, patch: Patch):
+    write_lines(path, format_patch(patch))
+
+
+def read_patch(path: Path) -> Patch:
+    return parse_patch(read_lines(path))
+
+
+def apply_patch(screen: ScreenProtocol, patch: Patch) -> ScreenProtocol:
+    """Apply a patch to a screen.
+
+    The screen is changed in place and returned, unless the patch resizes it.
+    Then a new screen of the same type is returned, holding the part of the old
+    screen that still fits.
+    """
+    if (screen.w, screen.h) != patch.old_size:
+        raise CanvasException("Patch is for a {}x{} drawing.".format(*patch.old_size))
+
+    if patch.new_size != patch.old_size:
+        resized = type(screen)(*patch.new_size)
+        for y in range(min(screen.h, resized.h)):
+            for x1, x2, c in screen.runs(y):
+                resized.fill_span(c, x1, x2, y)
+        screen = resized
+
+    for change in patch.changes:
+        x = change.x
+        for c, group in groupby(graphemes(change.text)):
+            length = len(list(group))
+            screen.fill_span(c, x, x + length - 1, change.y)
+            x += length
+
+    return screen
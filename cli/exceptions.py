@@ -1,2 +1,10 @@
 class InvalidCommandException(Exception):
     ...
+
+
+class CanvasException(Exception):
+    ...
+
+
+class LayerException(CanvasException):
+    ...
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import re
+import time
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from screen import ScreenProtocol
+
+FILL_LIMIT = 100_000
+SPANS_PER_BATCH = 1024
+PROGRESS_INTERVAL = 0.5
+
+
+def _push_runs(
+    screen: ScreenProtocol,
+    seeds: list[tuple[int, int]],
+    target: str,
+    x1: int,
+    x2: int,
+    y: int,
+    limit: int,
+) -> bool:
+    """Push a seed for each run of `target` on row y between x1 and x2.
+
+    Returns False if a seed was dropped because `limit` seeds are pending.
+    """
+    in_run = False
+    for x in range(x1, x2 + 1):
+        if screen.get_char(x, y) != target:
+            in_run = False
+        elif not in_run:
+            in_run = True
+            if len(seeds) >= limit:
+                return False
+            seeds.append((x, y))
+    return True
+
+
+def _bits(mask: int) -> str:
+    """The bits of a row mask as a string, with column 0 first."""
+    return format(mask, "b")[::-1]
+
+
+def _rescan(
+    screen: ScreenProtocol,
+    seeds: list[tuple[int, int]],
+    target: str,
+    filled_rows: dict[int, int],
+    limit: int,
+) -> bool:
+    """Push seeds for cells of `target` next to filled cells.
+
+    Filled spans always reach as far left and right as `target` goes, so only
+    the cells above and below them need checking, on the rows next to rows in
+    `filled_rows`.  Returns False if a seed was dropped.
+    """
+    rows = {ny for y in filled_rows for ny in (y - 1, y + 1) if 0 <= ny < screen.h}
+    for y in sorted(rows):
+        bits = _bits(filled_rows.get(y - 1, 0) | filled_rows.get(y + 1, 0))
+        in_run = False
+        for x, c in enumerate(screen.cells(y)):
+            if c != target or x >= len(bits) or bits[x] != "1":
+                in_run = False
+            elif not in_run:
+                in_run = True
+                if len(seeds) >= limit:
+                    return False
+                seeds.append((x, y))
+    return True
+
+
+def _undo(screen: ScreenProtocol, filled_rows: dict[int, int], target: str):
+    """Put `target` back on every filled cell."""
+    for y, mask in filled_rows.items():
+        for run in re.finditer("1+", _bits(mask)):
+            screen.fill_span(target, run.start(), run.end() - 1, y)
+
+
+def scanline_fill(
+    screen: ScreenProtocol,
+    x: int,
+    y: int,
+    c: str,
+    limit: int = FILL_LIMIT,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """Fill the area connected to (x, y) that has the same character with `c`.
+
+    Whole horizontal spans are filled at a time, and a seed is kept for each
+    span still to fill on the rows above and below.  At most `limit` seeds are
+    kept.  When more are found the rest are dropped and found again afterwards
+    by rescanning the rows the fill touched, so the seeds stay bounded however
+    large or maze-like the area is.
+
+    The cells filled so far are marked in a bit mask for each row the fill
+    touched, never on the screen itself.  The masks tell filled cells from
+    cells that already held `c` when rescanning, and a KeyboardInterrupt puts
+    the filled cells back as they were before it is raised again.  They take
+    a bit per cell of those rows, whatever the limit.
+
+    Returns the number of cells filled.
+
+    params:
+        screen: The screen to fill on.
+        x: Column to fill from.
+        y: Row to fill from.
+        c: Character to fill with.
+        limit: Most seeds to keep at once.
+        progress: Called with the number of cells filled so far, about every
+            `PROGRESS_INTERVAL` seconds while the fill runs.
+    """
+    target = screen.get_char(x, y)
+    if target == c:
+        return 0
+
+    w, h = screen.w, screen.h
+    seeds = [(x, y)]
+    dropped = False
+    filled = 0
+    filled_rows: dict[int, int] = {}
+    spans = 0
+    last_report = time.monotonic()
+    try:
+        while seeds:
+            sx, sy = seeds.pop()
+            if screen.get_char(sx, sy) == target:
+                x1 = x2 = sx
+                while x1 > 0 and screen.get_char(x1 - 1, sy) == target:
+                    x1 -= 1
+                while x2 < w - 1 and screen.get_char(x2 + 1, sy) == target:
+                    x2 += 1
+
+                # Marked before filling, so an interrupted span is undone too.
+                span = ((1 << (x2 - x1 + 1)) - 1) << x1
+                filled_rows[sy] = filled_rows.get(sy, 0) | span
+                screen.fill_span(c, x1, x2, sy)
+                filled += x2 - x1 + 1
+                for ny in (sy - 1, sy + 1):
+                    if 0 <= ny < h and not _push_runs(
+                        screen, seeds, target, x1, x2, ny, limit
+                    ):
+                        dropped = True
+
+            if not seeds and dropped:
+                dropped = not _rescan(screen, seeds, target, filled_rows, limit)
+
+            spans += 1
+            if progress is not None and spans % SPANS_PER_BATCH == 0:
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    progress(filled)
+    except KeyboardInterrupt:
+        _undo(screen, filled_rows, target)
+        raise
+
+    return filled
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import unicodedata
+
+from exceptions import CanvasException
+
+# Cells are stored as 2 byte glyph IDs.
+MAX_GLYPHS = 1 << 16
+
+ZWJ = "\u200d"
+VS16 = "\ufe0f"
+
+
+def _extends(c: str) -> bool:
+    """Whether `c` belongs to the grapheme before it rather than starting one."""
+    code = ord(c)
+    return (
+        unicodedata.category(c) in ("Mn", "Me", "Mc")
+        or c == ZWJ
+        or 0xFE00 <= code <= 0xFE0F  # Variation selectors
+        or 0xE0100 <= code <= 0xE01EF  # Variation selectors supplement
+        or 0x1F3FB <= code <= 0x1F3FF  # Skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F  # Tags, as in subdivision flags
+    )
+
+
+def _regional_indicator(c: str) -> bool:
+    return 0x1F1E6 <= ord(c) <= 0x1F1FF
+
+
+def graphemes(text: str) -> list[str]:
+    """Split text into user-perceived characters.
+
+    A simplified grapheme segmentation that keeps combining marks, variation
+    selectors, skin tones and zero width joiner sequences with the character
+    they modify, and pairs regional indicators into flags.
+    """
+    clusters: list[str] = []
+    for c in text:
+        if clusters and (
+            _extends(c)
+            or clusters[-1][-1] == ZWJ
+            or (
+                _regional_indicator(c)
+                and len(clusters[-1]) == 1
+                and _regional_indicator(clusters[-1])
+            )
+        ):
+            clusters[-1] += c
+        else:
+            clusters.append(c)
+    return clusters
+
+
+def display_width(glyph: str) -> int:
+    """Number of terminal columns a grapheme takes up: 0, 1 or 2."""
+    if VS16 in glyph or _regional_indicator(glyph[0]):
+        return 2
+
+    width = 0
+    for c in glyph:
+        if _extends(c) or unicodedata.category(c) in ("Cc", "Cf"):
+            continue
+        if unicodedata.east_asian_width(c) in ("W", "F"):
+            return 2
+        width = 1
+    return width
+
+
+class GlyphTable:
+    """Interned glyphs, so cells can be stored as small integer IDs.
+
+    Each glyph is a grapheme and is given the next free ID the first time it is
+    seen.  Its display width is worked out once and kept alongside.  ASCII
+    characters are interned up front so that their IDs are their code points,
+    which lets rows of ASCII IDs be decoded straight into text.
+    """
+
+    def __init__(self):
+        self.glyphs: list[str] = []
+        self.widths: list[int] = []
+        self.ids: dict[str, int] = {}
+        for code in range(128):
+            self.intern(chr(code))
+
+    def intern(self, glyph: str) -> int:
+        """ID of a glyph, adding it to the table if it is new."""
+        try:
+            return self.ids[glyph]
+        except KeyError:
+            if len(self.glyphs) == MAX_GLYPHS:
+                raise CanvasException("Too many different characters.") from None
+
+            glyph_id = self.ids[glyph] = len(self.glyphs)
+            self.glyphs.append(glyph)
+            self.widths.append(display_width(glyph))
+            return glyph_id
+
+    def width(self, glyph: str) -> int:
+        """Display width of a glyph."""
+        return self.widths[self.intern(glyph)]
+
+
+# Shared by every screen, so cells can be compared and copied between layers
+# and snapshots by ID.
+GLYPHS = GlyphTable()
+BLANK = GLYPHS.intern(" ")
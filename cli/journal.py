@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from command import (
+    ChangeCharCommand,
+    FillCommand,
+    LayerAction,
+    LayerCommand,
+    LineCommand,
+    LoadCommand,
+    NewCommand,
+    PatchCommand,
+    RawCommand,
+    RectangleCommand,
+    command_registry,
+)
+from exceptions import InvalidCommandException
+from glyphs import graphemes
+from layers import LayerStack
+from storage import read_lines, write_lines
+
+if TYPE_CHECKING:
+    from os import PathLike
+
+    from canvas import Canvas
+
+LOG_NAME = "commands.log"
+CHECKPOINT_NAME = "checkpoint.txt"
+CHECKPOINT_EVERY = 200
+SYNC_EVERY = 32
+SYNC_INTERVAL = 1.0
+
+
+def format_command(command) -> str | None:
+    """Format a command that changes the drawing as it would be typed.
+
+    Commands that do not change the drawing, like SAVE or REGION, give None.
+    """
+    match command:
+        case NewCommand(w, h):
+            return f"NEW {w} {h}"
+        case ChangeCharCommand(c):
+            return f"CHA {c}"
+        case LineCommand(x1, y1, x2, y2):
+            return f"LIN {x1} {y1} {x2} {y2}"
+        case RectangleCommand(x1, y1, x2, y2):
+            return f"REC {x1} {y1} {x2} {y2}"
+        case FillCommand(x, y):
+            return f"FILL {x} {y}"
+        case LayerCommand(action, name) if action != LayerAction.LIST:
+            return f"LAYER {action} {name}"
+        case _:
+            return None
+
+
+def write_checkpoint(path: Path, seq: int, canvas: Canvas):
+    """Write every layer of a canvas and the drawing character to a file.
+
+    The first line is a JSON header, followed by the rows of each layer from
+    bottom to top.
+    """
+    layers = canvas.layers
+    header = {
+        "seq": seq,
+        "char": canvas.char,
+        "w": canvas.w,
+        "h": canvas.h,
+        "active": layers.active,
+        "layers": [
+            {"name": name, "hidden": name in layers.hidden} for name in layers.layers
+        ],
+    }
+
+    def lines():
+        yield json.dumps(header)
+        for screen in layers.layers.values():
+            yield from screen.rows()
+
+    write_lines(path, lines())
+
+
+def read_checkpoint(path: Path, canvas: Canvas) -> int:
+    """Restore a canvas from a checkpoint and return the checkpoint's sequence."""
+    header, *rows = read_lines(path)
+    header = json.loads(header)
+    w, h = header["w"], header["h"]
+
+    screens = {}
+    for i, layer in enumerate(header["layers"]):
+        screen = canvas.screen_type(w, h)
+        for y, line in enumerate(rows[i * h : (i + 1) * h]):
+            x = 0
+            for c, group in groupby(graphemes(line)):
+                length = len(list(group))
+                screen.fill_span(c, x, x + length - 1, y)
+                x += length
+        screens[layer["name"]] = screen
+
+    (name, base), *others = screens.items()
+    stack = LayerStack(base, name)
+    stack.layers.update(others)
+    stack.hidden = {layer["name"] for layer in header["layers"] if layer["hidden"]}
+    stack.active = header["active"]
+    canvas.restore(stack, header["char"])
+
+    return header["seq"]
+
+
+class Journal:
+    """An append-only log of drawing commands with periodic checkpoints.
+
+    Commands that change the drawing are appended to the log as they are
+    applied.  Every `checkpoint_every` commands the whole drawing is written to
+    a checkpoint and the log starts over, so recovering after a crash replays
+    at most that many commands however long the session was.
+
+    Each command is flushed to the operating system as it is logged, so a
+    crash of the CLI loses nothing.  The log is fsynced in batches, every
+    `sync_every` commands or on the first command after `sync_interval`
+    seconds, so a crash of the machine loses at most the commands since the
+    last fsync.
+
+    params:
+        directory: Directory holding the log and checkpoint.  Created if needed.
+        checkpoint_every: Commands between checkpoints.
+        sync_every: Commands between fsyncs of the log.
+        sync_interval: Seconds after which the log is fsynced on the next
+            command, however few commands are pending.  The log is also
+            fsynced when the journal is closed.
+    """
+
+    def __init__(
+        self,
+        directory: str | PathLike,
+        checkpoint_every: int = CHECKPOINT_EVERY,
+        sync_every: int = SYNC_EVERY,
+        sync_interval: float = SYNC_INTERVAL,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / LOG_NAME
+        self.checkpoint_path = self.directory / CHECKPOINT_NAME
+        self.checkpoint_every = checkpoint_every
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.seq = 0
+        self._log = None
+        self._since_checkpoint = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def recover(self, canvas: Canvas) -> list:
+        """Restore a canvas from the checkpoint, if any.
+
+        Returns the logged commands after the checkpoint, which the caller
+        replays.  A partly written last line, left by a crash, is ignored.
+        """
+        if self.checkpoint_path.exists():
+            self.seq = read_checkpoint(self.checkpoint_path, canvas)
+
+        commands = []
+        if not self.log_path.exists():
+            return commands
+
+        with self.log_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                seq, _, text = line.rstrip("\n").partition("\t")
+                try:
+                    if not line.endswith("\n"):
+                        raise ValueError("Partly written line.")
+                    seq = int(seq)
+                    raw_command = RawCommand.from_str(text)
+                except (ValueError, InvalidCommandException):
+                    break
+
+                # Lines up to the checkpoint are left over from a crash between
+                # writing the checkpoint and emptying the log.
+                if seq <= self.seq:
+                    continue
+
+                commands.append(
+                    command_registry[raw_command.kind].from_raw_command(
+                        raw_command=raw_command
+                    )
+                )
+                self.seq = seq
+
+        return commands
+
+    def _log_file(self):
+        if self._log is None:
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        return self._log
+
+    def record(self, command, canvas: Canvas):
+        """Log a command that has been applied to `canvas`."""
+        if isinstance(command, (LoadCommand, PatchCommand)):
+            # The file could change before the command is replayed.
+            self.checkpoint(canvas)
+            return
+
+        text = format_command(command)
+        if text is None:
+            return
+
+        self.seq += 1
+        log = self._log_file()
+        log.write(f"{self.seq}\t{text}\n")
+        log.flush()
+        self._since_checkpoint += 1
+        self._unsynced += 1
+
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint(canvas)
+        elif (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        """Fsync the log."""
+        self._last_sync = time.monotonic()
+        if self._log is None or not self._unsynced:
+            return
+
+        os.fsync(self._log.fileno())
+        self._unsynced = 0
+
+    def checkpoint(self, canvas: Canvas):
+        """Write the whole drawing to the checkpoint and empty the log."""
+        write_checkpoint(self.checkpoint_path, self.seq, canvas)
+
+        # The checkpoint covers everything in the log, so it needs no fsync.
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            os.fsync(f.fileno())
+        self._since_checkpoint = 0
+        self._unsynced = 0
+
+    def close(self):
+        """Sync and close the log."""
+        if self._log is None:
+            return
+
+        self.sync()
+        self._log.close()
+        self._log = None
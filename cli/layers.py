@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from exceptions import LayerException
+from screen import ScreenProtocol
+
+TRANSPARENT = " "
+
+
+class LayerStack:
+    """Named screens that are composited on top of each other.
+
+    Layers are kept bottom to top in the order they were added.  Cells holding
+    `TRANSPARENT` let the layers below show through when composited.
+
+    params:
+        base: The bottom layer.
+        name: Name of the bottom layer.
+    """
+
+    def __init__(self, base: ScreenProtocol, name: str = "background"):
+        self.layers: dict[str, ScreenProtocol] = {name: base}
+        self.hidden: set[str] = set()
+        self.active = name
+
+    @property
+    def screen(self) -> ScreenProtocol:
+        """The layer that is currently being drawn to."""
+        return self.layers[self.active]
+
+    def _get(self, name: str) -> ScreenProtocol:
+        try:
+            return self.layers[name]
+        except KeyError as e:
+            raise LayerException(f"No layer named `{name}`.") from e
+
+    def add(self, name: str) -> ScreenProtocol:
+        """Add an empty layer on top and make it active."""
+        return self._push(name, self._blank())
+
+    def copy(self, name: str) -> ScreenProtocol:
+        """Add a copy-on-write snapshot of the active layer and make it active."""
+        return self._push(name, self.screen.snapshot())
+
+    def _blank(self) -> ScreenProtocol:
+        """A blank screen with the same size and storage as the layers."""
+        return type(self.screen)(self.screen.w, self.screen.h)
+
+    def _push(self, name: str, screen: ScreenProtocol) -> ScreenProtocol:
+        if name in self.layers:
+            raise LayerException(f"A layer named `{name}` already exists.")
+
+        self.layers[name] = screen
+        self.active = name
+        return screen
+
+    def use(self, name: str) -> ScreenProtocol:
+        """Make an existing layer active."""
+        self._get(name)
+        self.active = name
+        return self.screen
+
+    def remove(self, name: str):
+        """Remove a layer.  The top remaining layer becomes active if needed."""
+        self._get(name)
+        if len(self.layers) == 1:
+            raise LayerException("Can not remove the last layer.")
+
+        del self.layers[name]
+        self.hidden.discard(name)
+        if self.active == name:
+            self.active = next(reversed(self.layers))
+
+    def set_visible(self, name: str, visible: bool):
+        self._get(name)
+        if visible:
+            self.hidden.discard(name)
+        else:
+            self.hidden.add(name)
+
+    def composite(self) -> ScreenProtocol:
+        """Flatten the visible layers into a single screen.
+
+        With a single visible layer that layer is returned as is, so callers
+        must not draw to the result.
+        """
+        visible = [s for name, s in self.layers.items() if name not in self.hidden]
+        if not visible:
+            return self._blank()
+
+        if len(visible) == 1:
+            return visible[0]
+
+        bottom, *others = visible
+        result = bottom.snapshot()
+        for layer in others:
+            for y in range(layer.h):
+                for x1, x2, c in layer.runs(y):
+                    if c != TRANSPARENT:
+                        result.fill_span(c, x1, x2, y)
+
+        return result
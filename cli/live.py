@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from exceptions import CanvasException
+from screen import ScreenProtocol
+
+# Layout of the shared memory block, read by `game/live.py`:
+#   magic, state, version, width, height, writer pid, then width * height cell
+#   bytes.  The version is odd while the cells are being written.
+HEADER = struct.Struct("<4sIQIII")
+MAGIC = b"TDRW"
+STATE_OPEN = 0
+STATE_CLOSED = 1
+
+
+def _process_exists(pid: int) -> bool:
+    if os.name == "nt":
+        # Blocks are freed with their last handle on Windows, so one that
+        # still exists is still held open.
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def encode_row(cells: list[str]) -> bytes:
+    """Encode a row of cells as one byte per cell.
+
+    Glyphs that are not a single latin-1 character are sent as `?`.
+    """
+    return "".join(c if len(c) == 1 else "?" for c in cells).encode(
+        "latin-1", "replace"
+    )
+
+
+class LivePublisher:
+    """Publish a screen into shared memory for the game to render live.
+
+    params:
+        name: Name of the shared memory block.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._shm: shared_memory.SharedMemory | None = None
+        self._version = 0
+        self._w = 0
+        self._h = 0
+        self._rows: list[object] = []
+        self._data: list[bytes] = []
+
+    def _open(self, w: int, h: int):
+        self._close_block()
+        size = HEADER.size + max(w * h, 1)
+        try:
+            self._shm = shared_memory.SharedMemory(self.name, create=True, size=size)
+        except FileExistsError:
+            self._remove_stale_block()
+            self._shm = shared_memory.SharedMemory(self.name, create=True, size=size)
+
+        self._w, self._h = w, h
+        self._rows = [[] for _ in range(h)]
+        self._data = [b""] * h
+        self._write_header()
+
+    def _remove_stale_block(self):
+        """Remove a block left behind by a session that did not close it.
+
+        Raises a `CanvasException` if the block is not a live drawing, or is
+        still open in a running process.
+        """
+        existing = shared_memory.SharedMemory(self.name)
+        try:
+            if existing.size < HEADER.size:
+                raise CanvasException(f"{self.name} is not a live drawing.")
+            magic, state, _, _, _, pid = HEADER.unpack_from(existing.buf)
+            if magic != MAGIC:
+                raise CanvasException(f"{self.name} is not a live drawing.")
+            if state == STATE_OPEN and _process_exists(pid):
+                raise CanvasException(
+                    f"{self.name} is already published by process {pid}."
+                )
+        except CanvasException:
+            # Stop the resource tracker from unlinking it when the CLI exits.
+            resource_tracker.unregister(existing._name, "shared_memory")
+            raise
+        finally:
+            existing.close()
+        existing.unlink()
+
+    def _write_header(self, state: int = STATE_OPEN):
+        HEADER.pack_into(
+            self._shm.buf, 0, MAGIC, state, self._version, self._w, self._h, os.getpid()
+        )
+
+    def publish(self, screen: ScreenProtocol):
+        """Copy the rows of `screen` that changed since the last publish.
+
+        The published screen is snapshotted, so rows that are drawn to after
+        publishing are copied and can be told apart from untouched rows by
+        identity alone.
+        """
+        if self._shm is None or (screen.w, screen.h) != (self._w, self._h):
+            self._open(screen.w, screen.h)
+
+        snapshot = screen.snapshot()
+        changed = []
+        for y in range(snapshot.h):
+            row = snapshot.raw_row(y)
+            if row is self._rows[y]:
+                continue
+            self._rows[y] = row
+            data = encode_row(snapshot.cells(y))
+            if data != self._data[y]:
+                self._data[y] = data
+                changed.append(y)
+
+        if not changed:
+            return
+
+        buf = self._shm.buf
+        self._version += 1
+        self._write_header()
+        for y in changed:
+            start = HEADER.size + y * self._w
+            buf[start : start + self._w] = self._data[y]
+        self._version += 1
+        self._write_header()
+
+    def _close_block(self):
+        if self._shm is None:
+            return
+
+        self._write_header(STATE_CLOSED)
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def close(self):
+        """Tell readers the block is gone and release it."""
+        self._close_block()
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_right
+from collections import deque
+from typing import TYPE_CHECKING, Callable
+
+from fill import PROGRESS_INTERVAL
+
+if TYPE_CHECKING:
+    from screen import ScreenProtocol
+
+RUNS_PER_BATCH = 256
+
+
+class _Row:
+    """The runs of one row, as parallel lists in column order.
+
+    Runs are maximal, so two runs next to each other never hold the same
+    character.
+    """
+
+    __slots__ = ("starts", "ends", "chars", "labels")
+
+    def __init__(self):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.chars: list[str] = []
+        self.labels: list[int] = []
+
+    def find(self, x: int) -> int:
+        """Index of the run holding column x."""
+        return bisect_right(self.starts, x) - 1
+
+    def overlapping(self, x1: int, x2: int) -> range:
+        """Indices of the runs holding any column from x1 to x2."""
+        return range(self.find(x1), self.find(x2) + 1)
+
+
+class RegionIndex:
+    """Connected component labels for the runs of a screen.
+
+    Cells holding the same character that touch horizontally or vertically
+    belong to the same region.  The index keeps the runs of the same character
+    on every row, and joins runs into regions with union-find, so its size and
+    cost follow the number of runs rather than the number of cells.
+
+    Labels are kept up to date as the screen is drawn to.  A region that loses
+    cells where it may have been split in two is only marked stale, and is
+    relabelled from its runs the next time it is asked about.  A fill rewrites
+    the runs of a known region and joins it with the runs around it, so it
+    never rescans the region cell by cell.
+
+    params:
+        screen: The screen to index.  The index registers itself on the screen
+            so that `Screen.put_char` and `Screen.fill_span` can keep it up to
+            date.
+    """
+
+    def __init__(self, screen: ScreenProtocol):
+        self.screen = screen
+        self._rows: list[_Row] = []
+        # Union-find over labels.  Sizes and row ranges are kept for roots.
+        self._parent: list[int] = []
+        self._sizes: list[int] = []
+        self._tops: list[int] = []
+        self._bottoms: list[int] = []
+        self._stale: set[int] = set()
+        self._applying = False
+        self.rebuild()
+        screen.region_index = self
+
+    def _new_label(self, size: int, y: int) -> int:
+        label = len(self._parent)
+        self._parent.append(label)
+        self._sizes.append(size)
+        self._tops.append(y)
+        self._bottoms.append(y)
+        return label
+
+    def _find(self, label: int) -> int:
+        parent = self._parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def _union(self, a: int, b: int) -> int:
+        """Merge the regions of two labels and return the root."""
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return a
+
+        if self._sizes[a] < self._sizes[b]:
+            a, b = b, a
+
+        self._parent[b] = a
+        self._sizes[a] += self._sizes[b]
+        self._tops[a] = min(self._tops[a], self._tops[b])
+        self._bottoms[a] = max(self._bottoms[a], self._bottoms[b])
+        if b in self._stale:
+            self._stale.discard(b)
+            self._stale.add(a)
+
+        return a
+
+    def _join_rows(self, upper: _Row, lower: _Row):
+        """Merge the regions of runs with the same character on two rows."""
+        i = j = 0
+        while i < len(upper.starts) and j < len(lower.starts):
+            if upper.chars[i] == lower.chars[j]:
+                self._union(upper.labels[i], lower.labels[j])
+            if upper.ends[i] < lower.ends[j]:
+                i += 1
+            else:
+                j += 1
+
+    def rebuild(self):
+        """Label every run of the screen from scratch."""
+        self._rows = []
+        self._parent = []
+        self._sizes = []
+        self._tops = []
+        self._bottoms = []
+        self._stale = set()
+
+        for y in range(self.screen.h):
+            row = _Row()
+            for x1, x2, c in self.screen.runs(y):
+                if row.chars and row.chars[-1] == c:
+                    row.ends[-1] = x2
+                    self._sizes[row.labels[-1]] += x2 - x1 + 1
+                    continue
+                row.starts.append(x1)
+                row.ends.append(x2)
+                row.chars.append(c)
+                row.labels.append(self._new_label(x2 - x1 + 1, y))
+
+            if self._rows:
+                self._join_rows(self._rows[-1], row)
+            self._rows.append(row)
+
+    def _members(self, root: int) -> dict[int, list[int]]:
+        """Indices of the runs of a region, by row."""
+        members = {}
+        for y in range(self._tops[root], self._bottoms[root] + 1):
+            runs = [
+                k
+                for k, label in enumerate(self._rows[y].labels)
+                if self._find(label) == root
+            ]
+            if runs:
+                members[y] = runs
+        return members
+
+    def _split(self, root: int):
+        """Relabel a region that may have been disconnected by a change."""
+        self._stale.discard(root)
+        members = {y: set(runs) for y, runs in self._members(root).items()}
+        for y, runs in members.items():
+            while runs:
+                start = runs.pop()
+                label = self._new_label(0, y)
+                queue = deque([(y, start)])
+                while queue:
+                    cy, k = queue.popleft()
+                    row = self._rows[cy]
+                    row.labels[k] = label
+                    self._sizes[label] += row.ends[k] - row.starts[k] + 1
+                    self._tops[label] = min(self._tops[label], cy)
+                    self._bottoms[label] = max(self._bottoms[label], cy)
+                    for ny in (cy - 1, cy + 1):
+                        others = members.get(ny)
+                        if not others:
+                            continue
+                        other = self._rows[ny]
+                        for nk in other.overlapping(row.starts[k], row.ends[k]):
+                            if nk in others:
+                                others.discard(nk)
+                                queue.append((ny, nk))
+
+    def _root_at(self, x: int, y: int) -> int:
+        row = self._rows[y]
+        k = row.find(x)
+        root = self._find(row.labels[k])
+        if root in self._stale:
+            self._split(root)
+            root = self._find(row.labels[k])
+        return root
+
+    def _neighbours(self, y: int) -> list[_Row]:
+        return [self._rows[ny] for ny in (y - 1, y + 1) if 0 <= ny < len(self._rows)]
+
+    def _coalesce(self, y: int):
+        """Merge runs next to each other on row y that hold the same character."""
+        row = self._rows[y]
+        merged = _Row()
+        for start, end, c, label in zip(row.starts, row.ends, row.chars, row.labels):
+            if merged.chars and merged.chars[-1] == c:
+                merged.ends[-1] = end
+                merged.labels[-1] = self._union(merged.labels[-1], label)
+                continue
+            merged.starts.append(start)
+            merged.ends.append(end)
+            merged.chars.append(c)
+            merged.labels.append(label)
+        self._rows[y] = merged
+
+    def update(self, x1: int, x2: int, y: int, c: str):
+        """Record that columns x1 to x2 of row y now hold `c`."""
+        if self._applying:
+            return
+
+        row = self._rows[y]
+        i, j = row.find(x1), row.find(x2)
+        if all(row.chars[k] == c for k in range(i, j + 1)):
+            return
+
+        neighbours = self._neighbours(y)
+        label = self._new_label(0, y)
+        for k in range(i, j + 1):
+            root = self._find(row.labels[k])
+            if row.chars[k] == c:
+                label = self._union(label, root)
+                continue
+
+            a, b = max(row.starts[k], x1), min(row.ends[k], x2)
+            self._sizes[root] -= b - a + 1
+            label = self._find(label)
+            self._sizes[label] += b - a + 1
+            if not self._sizes[root]:
+                self._stale.discard(root)
+                continue
+
+            # The region can only fall apart if the removed cells touched it
+            # in more than one place.
+            touching = (k == i and row.starts[k] < x1) + (k == j and row.ends[k] > x2)
+            for other in neighbours:
+                for nk in other.overlapping(a, b):
+                    if (
+                        other.chars[nk] == row.chars[k]
+                        and self._find(other.labels[nk]) == root
+                    ):
+                        touching += 1
+            if touching > 1:
+                self._stale.add(root)
+
+        for other in neighbours:
+            for nk in other.overlapping(x1, x2):
+                if other.chars[nk] == c:
+                    label = self._union(label, other.labels[nk])
+
+        starts, ends, chars, labels = [], [], [], []
+        if row.starts[i] < x1:
+            starts.append(row.starts[i])
+            ends.append(x1 - 1)
+            chars.append(row.chars[i])
+            labels.append(row.labels[i])
+        starts.append(x1)
+        ends.append(x2)
+        chars.append(c)
+        labels.append(label)
+        if row.ends[j] > x2:
+            starts.append(x2 + 1)
+            ends.append(row.ends[j])
+            chars.append(row.chars[j])
+            labels.append(row.labels[j])
+        row.starts[i : j + 1] = starts
+        row.ends[i : j + 1] = ends
+        row.chars[i : j + 1] = chars
+        row.labels[i : j + 1] = labels
+        self._coalesce(y)
+
+    def size(self, x: int, y: int) -> int:
+        """Count the cells in the region containing (x, y)."""
+        return self._sizes[self._root_at(x, y)]
+
+    def sizes(self) -> list[int]:
+        """Sizes of every region on the screen, largest first."""
+        for root in list(self._stale):
+            self._split(root)
+        roots = {self._find(label) for row in self._rows for label in row.labels}
+        return sorted((self._sizes[root] for root in roots), reverse=True)
+
+    def fill(
+        self,
+        x: int,
+        y: int,
+        c: str,
+        progress: Callable[[int], None] | None = None,
+    ):
+        """Fill the region containing (x, y) with `c`.
+
+        Every run of the region is rewritten whole, and only the runs next to
+        it are joined with it.  A KeyboardInterrupt puts the runs written so
+        far back as they were before it is raised again.
+
+        params:
+            x: Column to fill from.
+            y: Row to fill from.
+            c: Character to fill with.
+            progress: Called with the number of cells filled so far, about
+                every `PROGRESS_INTERVAL` seconds while the fill runs.
+        """
+        root = self._root_at(x, y)
+        target = self._rows[y].chars[self._rows[y].find(x)]
+        if target == c:
+            return
+
+        runs = [(ry, k) for ry, ks in self._members(root).items() for k in ks]
+        filled = 0
+        written = 0
+        last_report = time.monotonic()
+        self._applying = True
+        try:
+            for ry, k in runs:
+                row = self._rows[ry]
+                written += 1
+                self.screen.fill_span(c, row.starts[k], row.ends[k], ry)
+                filled += row.ends[k] - row.starts[k] + 1
+                if progress is not None and written % RUNS_PER_BATCH == 0:
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        progress(filled)
+        except KeyboardInterrupt:
+            for ry, k in runs[:written]:
+                row = self._rows[ry]
+                self.screen.fill_span(target, row.starts[k], row.ends[k], ry)
+            raise
+        finally:
+            self._applying = False
+
+        # The region now has the same character as some of its neighbours.
+        for ry, k in runs:
+            self._rows[ry].chars[k] = c
+        for ry, k in runs:
+            row = self._rows[ry]
+            for other in self._neighbours(ry):
+                for nk in other.overlapping(row.starts[k], row.ends[k]):
+                    if other.chars[nk] == c:
+                        self._union(row.labels[k], other.labels[nk])
+        for ry in {ry for ry, _ in runs}:
+            self._coalesce(ry)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from regions import RegionIndex
+
+
+class Runs:
+    """A row stored as runs of the same character.
+
+    Run i covers the cells from `starts[i]` up to the next run's start, and
+    neighbouring runs always hold different characters.
+    """
+
+    __slots__ = ("starts", "chars")
+
+    def __init__(self, starts: list[int], chars: list[str]):
+        self.starts = starts
+        self.chars = chars
+
+    def copy(self) -> Runs:
+        return Runs(self.starts.copy(), self.chars.copy())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Runs):
+            return NotImplemented
+        return self.starts == other.starts and self.chars == other.chars
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def find(self, x: int) -> int:
+        """Index of the run containing column x."""
+        return bisect_right(self.starts, x) - 1
+
+    def assign(self, c: str, x1: int, x2: int, w: int):
+        """Set the cells from x1 to x2 inclusive to `c`."""
+        starts, chars = self.starts, self.chars
+        i = self.find(x1)
+        j = self.find(x2)
+        end = starts[j + 1] if j + 1 < len(starts) else w
+
+        new_starts, new_chars = [], []
+        if starts[i] < x1:
+            new_starts.append(starts[i])
+            new_chars.append(chars[i])
+        new_starts.append(x1)
+        new_chars.append(c)
+        if x2 + 1 < end:
+            new_starts.append(x2 + 1)
+            new_chars.append(chars[j])
+
+        starts[i : j + 1] = new_starts
+        chars[i : j + 1] = new_chars
+
+        # Merge runs that now hold the same character as their neighbour.
+        for k in range(min(i + len(new_starts), len(starts) - 1), max(i, 1) - 1, -1):
+            if chars[k] == chars[k - 1]:
+                del starts[k]
+                del chars[k]
+
+
+class RunLengthScreen:
+    """A screen that stores each row as runs of the same character.
+
+    Memory and saving scale with the number of runs rather than the area, which
+    suits large canvases of mostly blank or uniform terrain.  Writing a cell
+    costs O(log runs) to find it.  Rows are shared copy-on-write with
+    snapshots, like `Screen`.
+    """
+
+    def __init__(self, w: int, h: int):
+        self.w = w
+        self.h = h
+        self.buffer: list[Runs] = [
+            Runs([0] if w else [], [" "] if w else []) for _ in range(h)
+        ]
+        self.region_index: RegionIndex | None = None
+        self._owned: list[bool] = [True] * h
+
+    def snapshot(self) -> RunLengthScreen:
+        """Take a copy-on-write copy of the screen.  See `Screen.snapshot`."""
+        copy = RunLengthScreen.__new__(RunLengthScreen)
+        copy.w = self.w
+        copy.h = self.h
+        copy.buffer = list(self.buffer)
+        copy.region_index = None
+        copy._owned = [False] * self.h
+        self._owned = [False] * self.h
+        return copy
+
+    def _own_row(self, y: int) -> Runs:
+        if not self._owned[y]:
+            self.buffer[y] = self.buffer[y].copy()
+            self._owned[y] = True
+        return self.buffer[y]
+
+    def get_char(self, x: int, y: int) -> str:
+        if not (0 <= x < self.w):
+            raise IndexError("column out of range")
+        runs = self.buffer[y]
+        return runs.chars[runs.find(x)]
+
+    def put_char(self, c: str, x: int, y: int):
+        if not (0 <= x < self.w and 0 <= y < self.h):
+            # Ignore drawing off screen
+            return
+
+        old = self.get_char(x, y)
+        if old == c:
+            return
+
+        self._own_row(y).assign(c, x, x, self.w)
+
+        if self.region_index is not None:
+            self.region_index.update(x, x, y, c)
+
+    def fill_span(self, c: str, x1: int, x2: int, y: int):
+        """Draw `c` from x1 to x2 inclusive on row y, clipped to the screen."""
+        x1, x2 = max(x1, 0), min(x2, self.w - 1)
+        if not 0 <= y < self.h or x1 > x2:
+            return
+
+        self._own_row(y).assign(c, x1, x2, self.w)
+
+        if self.region_index is not None:
+            self.region_index.update(x1, x2, y, c)
+
+    def fill_rect(self, c: str, x1: int, y1: int, x2: int, y2: int):
+        """Draw `c` over the rectangle between two corners, inclusive."""
+        for y in range(min(y1, y2), max(y1, y2) + 1):
+            self.fill_span(c, min(x1, x2), max(x1, x2), y)
+
+    def runs(self, y: int) -> Iterator[tuple[int, int, str]]:
+        """Runs of the same character on row y as (x1, x2, c), x2 inclusive."""
+        runs = self.buffer[y]
+        ends = runs.starts[1:] + [self.w]
+        for start, end, c in zip(runs.starts, ends, runs.chars):
+            yield start, end - 1, c
+
+    def row(self, y: int) -> str:
+        return "".join(c * (x2 - x1 + 1) for x1, x2, c in self.runs(y))
+
+    def cells(self, y: int) -> list[str]:
+        """The glyph in each column of row y."""
+        return [c for x1, x2, c in self.runs(y) for _ in range(x2 - x1 + 1)]
+
+    def raw_row(self, y: int) -> Runs:
+        """The storage of row y.  Snapshots share it until either side writes."""
+        return self.buffer[y]
+
+    def rows(self) -> Iterator[str]:
+        return (self.row(y) for y in range(self.h))
@@ -1,12 +1,162 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from itertools import groupby
+from typing import TYPE_CHECKING, Any, Iterator, Protocol
+
+from glyphs import BLANK, GLYPHS
+
+if TYPE_CHECKING:
+    from regions import RegionIndex
+
+
+class ScreenProtocol(Protocol):
+    """What drawing code needs from a screen, whatever its storage.
+
+    A cell holds one glyph, a grapheme that may be more than one code point, so
+    columns are indexed through `cells` rather than through the text of `row`.
+    """
+
+    w: int
+    h: int
+    region_index: RegionIndex | None
+
+    def __init__(self, w: int, h: int):
+        ...
+
+    def snapshot(self) -> ScreenProtocol:
+        ...
+
+    def get_char(self, x: int, y: int) -> str:
+        ...
+
+    def put_char(self, c: str, x: int, y: int):
+        ...
+
+    def fill_span(self, c: str, x1: int, x2: int, y: int):
+        ...
+
+    def fill_rect(self, c: str, x1: int, y1: int, x2: int, y2: int):
+        ...
+
+    def row(self, y: int) -> str:
+        ...
+
+    def cells(self, y: int) -> list[str]:
+        ...
+
+    def rows(self) -> Iterator[str]:
+        ...
+
+    def raw_row(self, y: int) -> Any:
+        ...
+
+    def runs(self, y: int) -> Iterator[tuple[int, int, str]]:
+        ...
+
+
+# Glyph IDs are stored as unsigned shorts, 2 bytes a cell.
+CELL_TYPECODE = "H"
+# ASCII glyph IDs are their code points, so a row of them decodes as UTF-16.
+ROW_ENCODING = "utf-16-le" if sys.byteorder == "little" else "utf-16-be"
+
+
 class Screen:
+    """A screen that stores each row as an array of interned glyph IDs.
+
+    Cells take 2 bytes each instead of an 8 byte pointer to a `str`, and glyphs
+    of any display width can be stored.  See `glyphs.GLYPHS`.
+    """
+
     def __init__(self, w: int, h: int):
         self.w = w
         self.h = h
-        self.buffer: list[list[str]] = [list(((" " * w))) for _ in range(h)]
+        blank_row = array(CELL_TYPECODE, [BLANK]) * w
+        self.buffer: list[array] = [array(CELL_TYPECODE, blank_row) for _ in range(h)]
+        self.region_index: RegionIndex | None = None
+        # Rows may be shared with snapshots and are copied before writing.
+        self._owned: list[bool] = [True] * h
+
+    def snapshot(self) -> Screen:
+        """Take a copy-on-write copy of the screen.
+
+        Both screens share their rows until one of them writes to a row, so
+        taking a snapshot costs O(rows) and memory only grows with the rows
+        that are changed afterwards.
+        """
+        copy = Screen.__new__(Screen)
+        copy.w = self.w
+        copy.h = self.h
+        copy.buffer = list(self.buffer)
+        copy.region_index = None
+        copy._owned = [False] * self.h
+        self._owned = [False] * self.h
+        return copy
+
+    def get_char(self, x: int, y: int) -> str:
+        return GLYPHS.glyphs[self.buffer[y][x]]
+
+    def _own_row(self, y: int) -> array:
+        if not self._owned[y]:
+            self.buffer[y] = array(CELL_TYPECODE, self.buffer[y])
+            self._owned[y] = True
+        return self.buffer[y]
 
     def put_char(self, c: str, x: int, y: int):
+        if x < 0 or y < 0:
+            # Ignore drawing off screen
+            return
+
         try:
-            self.buffer[y][x] = c
+            old = self.buffer[y][x]
         except IndexError:
             # Ignore drawing off screen
-            ...
+            return
+
+        self._own_row(y)[x] = GLYPHS.intern(c)
+
+        if self.region_index is not None:
+            self.region_index.update(x, x, y, c)
+
+    def fill_span(self, c: str, x1: int, x2: int, y: int):
+        """Draw `c` from x1 to x2 inclusive on row y, clipped to the screen."""
+        x1, x2 = max(x1, 0), min(x2, self.w - 1)
+        if not 0 <= y < self.h or x1 > x2:
+            return
+
+        glyph_array = array(CELL_TYPECODE, [GLYPHS.intern(c)])
+        self._own_row(y)[x1 : x2 + 1] = glyph_array * (x2 - x1 + 1)
+
+        if self.region_index is not None:
+            self.region_index.update(x1, x2, y, c)
+
+    def fill_rect(self, c: str, x1: int, y1: int, x2: int, y2: int):
+        """Draw `c` over the rectangle between two corners, inclusive."""
+        for y in range(min(y1, y2), max(y1, y2) + 1):
+            self.fill_span(c, min(x1, x2), max(x1, x2), y)
+
+    def row(self, y: int) -> str:
+        text = self.buffer[y].tobytes().decode(ROW_ENCODING, "surrogatepass")
+        if text.isascii():
+            return text
+        return "".join(self.cells(y))
+
+    def cells(self, y: int) -> list[str]:
+        """The glyph in each column of row y."""
+        return list(map(GLYPHS.glyphs.__getitem__, self.buffer[y]))
+
+    def raw_row(self, y: int) -> array:
+        """The storage of row y.  Snapshots share it until either side writes."""
+        return self.buffer[y]
+
+    def rows(self) -> Iterator[str]:
+        return (self.row(y) for y in range(self.h))
+
+    def runs(self, y: int) -> Iterator[tuple[int, int, str]]:
+        """Runs of the same character on row y as (x1, x2, c), x2 inclusive."""
+        x = 0
+        for glyph_id, group in groupby(self.buffer[y]):
+            length = len(list(group))
+            yield x, x + length - 1, GLYPHS.glyphs[glyph_id]
+            x += length
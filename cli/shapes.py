@@ -2,13 +2,30 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, field
-from typing import Any, Generator, Protocol
+from typing import Any, Generator, Iterable, Protocol
 
 
 class ShapeProtocol(Protocol):
     def points(self) -> Generator[Point, Any, None]:
         ...
 
+    def spans(self) -> Generator[Span, Any, None]:
+        ...
+
+
+def spans_from_points(points: Iterable[Point]) -> Generator[Span, Any, None]:
+    """Group points that follow each other along a row into spans."""
+    span = None
+    for p in points:
+        if span is not None and span.y == p.y and span.x2 + 1 == p.x:
+            span = Span(span.y, span.x1, p.x)
+            continue
+        if span is not None:
+            yield span
+        span = Span(p.y, p.x, p.x)
+    if span is not None:
+        yield span
+
 
 @dataclass(frozen=True)
 class Point:
@@ -21,6 +38,15 @@ class Point:
         )
 
 
+@dataclass(frozen=True)
+class Span:
+    """Cells on row y from x1 to x2 inclusive."""
+
+    y: int
+    x1: int
+    x2: int
+
+
 @dataclass(frozen=True)
 class Line:
     p1: Point
@@ -67,6 +93,14 @@ class Line:
                 for y in range(min_y, max_y + 1):
                     yield Point(math.floor(self.g(y)), y)
 
+    def spans(self) -> Generator[Span, Any, None]:
+        if self.p1.y == self.p2.y:
+            min_x = min(self.p1.x, self.p2.x)
+            max_x = max(self.p1.x, self.p2.x)
+            yield Span(self.p1.y, min_x, max_x)
+        else:
+            yield from spans_from_points(self.points())
+
 
 @dataclass
 class Rectangle:
@@ -99,3 +133,7 @@ class Rectangle:
         for line in self.sides:
             for point in line.points():
                 yield point
+
+    def spans(self) -> Generator[Span, Any, None]:
+        for line in self.sides:
+            yield from line.spans()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import stat
+from contextlib import contextmanager
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable
+
+from glyphs import graphemes
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+WRITE_BUFFER_SIZE = 1 << 20
+LINES_PER_WRITE = 1024
+
+
+@contextmanager
+def _replace(path: Path, mode: str):
+    """Open a temporary file next to `path` that replaces `path` once written.
+
+    A crash part way through never leaves a truncated file.  A symlink is
+    followed so that its target is replaced, and the permissions of an
+    existing file are kept.
+    """
+    path = path.resolve()
+    tmp = path.with_name(f".{path.name}.{os.urandom(4).hex()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        with open(fd, mode, buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_lines(path: Path, lines: Iterable[str]):
+    """Write rows of a drawing to a file.
+
+    The rows are written to a temporary file next to `path` which then replaces
+    `path`, so a crash part way through never leaves a truncated drawing.
+    Rows are joined into large chunks before writing.
+    """
+    with _replace(path, "w") as f:
+        lines = iter(lines)
+        while chunk := list(islice(lines, LINES_PER_WRITE)):
+            f.write("\n".join(chunk) + "\n")
+
+
+def write_bytes(path: Path, data: bytes):
+    """Write binary data to a file, replacing it like `write_lines`."""
+    with _replace(path, "wb") as f:
+        f.write(data)
+
+
+def read_lines(path: Path) -> list[str]:
+    """Read every row of a drawing from a file."""
+    with path.open("r") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def read_block(
+    path: Path,
+    cols: int,
+    rows: int,
+    col: int = 0,
+    row: int = 0,
+) -> list[str]:
+    """Read a rectangular block of a drawing from a file.
+
+    Fixed width ASCII files are read only up to the last needed row, so the
+    cost is proportional to the rows needed rather than to the file.  Each of
+    those rows is checked to be fixed width.  Any other file is parsed in
+    full, and its columns are graphemes.
+
+    params:
+        path: The file to read from.
+        cols: Number of columns to read.
+        rows: Number of rows to read.
+        col: First column to read.
+        row: First row to read.
+    """
+    if cols <= 0 or rows <= 0:
+        return []
+
+    with path.open("rb") as f:
+        first_line = f.readline()
+        stride = len(first_line)
+        size = path.stat().st_size
+        if (
+            stride > 1
+            and first_line.endswith(b"\n")
+            and first_line.isascii()
+            and size % stride == 0
+        ):
+            # Files saved on Windows end their lines with CRLF.
+            ending = b"\r\n" if first_line.endswith(b"\r\n") else b"\n"
+            width = stride - len(ending)
+            start = min(col, width)
+            length = min(cols, width - start)
+            block = []
+            f.seek(0)
+            for y in range(min(row + rows, size // stride)):
+                # Every row up to the block must be fixed width, or the rows
+                # after it are not where the stride puts them.
+                line = f.read(stride)
+                if (
+                    not line.isascii()
+                    or not line.endswith(ending)
+                    or line.count(b"\n") != 1
+                ):
+                    break
+                if y >= row:
+                    block.append(line[start : start + length].decode("ascii"))
+            else:
+                return block
+
+    return [
+        "".join(graphemes(line)[col : col + cols])
+        for line in read_lines(path)[row : row + rows]
+    ]
@@ -0,0 +1,295 @@
+"""Differential testing of drawing engines.
+
+Random command scripts are run against a reference engine and a candidate
+engine, and the final drawings are compared.  A mismatching script is shrunk to
+a minimal one that still mismatches, and the time each engine took is kept so
+the speed ratio between them can be reported.
+
+Run as a script for a longer session:
+
+    python -m tests.differential --runs 2000 --seed 1
+"""
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+Script = list[str]
+Engine = Callable[[Script], list[str]]
+
+
+def reference_engine(script: Script) -> list[str]:
+    """The drawing behaviour the CLI shipped with, kept frozen as an oracle.
+
+    Lines are sampled along y = mx + b, rectangles are four lines, and fills
+    replace the 4-connected area of the same character.  Drawing off screen is
+    ignored.
+    """
+    w = h = 0
+    buffer: list[list[str]] = []
+    char = "x"
+
+    def put_char(c: str, x: int, y: int):
+        if 0 <= x < w and 0 <= y < h:
+            buffer[y][x] = c
+
+    def line(x1: int, y1: int, x2: int, y2: int):
+        dx, dy = x1 - x2, y1 - y2
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        if dx == 0:
+            for y in range(min_y, max_y + 1):
+                put_char(char, x1, y)
+            return
+
+        m = dy / dx
+        b = y1 - m * x1
+        if -1.0 <= m <= 1.0:
+            for x in range(min_x, max_x + 1):
+                put_char(char, x, math.floor(m * x + b))
+        else:
+            for y in range(min_y, max_y + 1):
+                put_char(char, math.floor((y - b) / m), y)
+
+    for command in script:
+        kind, *params = command.split()
+        if kind != "CHA":
+            params = [int(p) for p in params]
+
+        match kind, params:
+            case "NEW", [nw, nh]:
+                w, h = nw, nh
+                buffer = [[" "] * w for _ in range(h)]
+            case "CHA", [c]:
+                char = c
+            case "LIN", [x1, y1, x2, y2]:
+                line(x1, y1, x2, y2)
+            case "REC", [x1, y1, x2, y2]:
+                min_x, max_x = min(x1, x2), max(x1, x2)
+                min_y, max_y = min(y1, y2), max(y1, y2)
+                line(min_x, min_y, max_x, min_y)
+                line(min_x, max_y, max_x, max_y)
+                line(min_x, min_y, min_x, max_y)
+                line(max_x, min_y, max_x, max_y)
+            case "FILL", [x, y]:
+                target = buffer[y][x]
+                if target == char:
+                    continue
+                stack = [(x, y)]
+                while stack:
+                    cx, cy = stack.pop()
+                    if 0 <= cx < w and 0 <= cy < h and buffer[cy][cx] == target:
+                        buffer[cy][cx] = char
+                        stack.append((cx + 1, cy))  # Right
+                        stack.append((cx - 1, cy))  # Left
+                        stack.append((cx, cy + 1))  # Below
+                        stack.append((cx, cy - 1))  # Above
+
+    return ["".join(line) for line in buffer]
+
+
+def application_engine(screen_type: type | None = None, **options) -> Engine:
+    """An engine that runs scripts through the CLI's command handling.
+
+    params:
+        screen_type: Storage for the canvas.  Defaults to `Screen`.
+        options: Other keyword arguments for the `Canvas`.
+    """
+
+    def run(script: Script) -> list[str]:
+        from application import Application
+        from canvas import Canvas
+        from screen import Screen
+
+        canvas = Canvas.blank(1, 1, screen_type=screen_type or Screen, **options)
+        app = Application(canvas, output=lambda *_: None)
+        for command in script:
+            app.handle_command(app.parse_command(command))
+        return list(app.canvas.lines())
+
+    return run
+
+
+def generate_script(
+    rng: random.Random,
+    max_size: int = 24,
+    length: int = 20,
+) -> Script:
+    """Generate a random script that starts with NEW and only fills on screen."""
+    w, h = rng.randint(1, max_size), rng.randint(1, max_size)
+    script = [f"NEW {w} {h}"]
+
+    def coordinate(limit: int) -> int:
+        # Mostly on screen, sometimes just off it.
+        return rng.randint(-2, limit + 1)
+
+    for _ in range(rng.randint(1, length)):
+        kind = rng.choice(("CHA", "LIN", "LIN", "REC", "FILL", "FILL"))
+        if kind == "CHA":
+            script.append(f"CHA {rng.choice('xo.#')}")
+        elif kind == "FILL":
+            script.append(f"FILL {rng.randrange(w)} {rng.randrange(h)}")
+        else:
+            x1, x2 = coordinate(w), coordinate(w)
+            y1, y2 = coordinate(h), coordinate(h)
+            script.append(f"{kind} {x1} {y1} {x2} {y2}")
+    return script
+
+
+def _is_valid(script: Script) -> bool:
+    """Scripts must start with NEW and only fill on screen."""
+    if not script or not script[0].startswith("NEW "):
+        return False
+    _, w, h = script[0].split()
+    if int(w) < 1 or int(h) < 1:
+        return False
+    for command in script[1:]:
+        kind, *params = command.split()
+        if kind == "NEW":
+            return False
+        if kind == "FILL":
+            x, y = (int(p) for p in params)
+            if not (0 <= x < int(w) and 0 <= y < int(h)):
+                return False
+    return True
+
+
+def shrink(script: Script, fails: Callable[[Script], bool]) -> Script:
+    """Shrink a failing script to a smaller one that still fails.
+
+    Commands are removed in ever smaller chunks, then numbers are moved
+    towards zero, until no single step keeps the script failing.
+    """
+
+    def attempt(candidate: Script) -> bool:
+        return _is_valid(candidate) and fails(candidate)
+
+    changed = True
+    while changed:
+        changed = False
+
+        chunk = max((len(script) - 1) // 2, 1)
+        while chunk >= 1:
+            i = 1
+            while i < len(script):
+                candidate = script[:i] + script[i + chunk :]
+                if attempt(candidate):
+                    script = candidate
+                    changed = True
+                else:
+                    i += chunk
+            chunk //= 2
+
+        for i, command in enumerate(script):
+            kind, *params = command.split()
+            for j, param in enumerate(params):
+                if not param.lstrip("-").isdigit():
+                    continue
+                value = int(param)
+                for smaller in (0, value // 2, value - (1 if value > 0 else -1)):
+                    if abs(smaller) >= abs(value):
+                        continue
+                    new_params = params[:j] + [str(smaller)] + params[j + 1 :]
+                    candidate = script.copy()
+                    candidate[i] = " ".join([kind, *new_params])
+                    if attempt(candidate):
+                        script = candidate
+                        params = new_params
+                        changed = True
+                        break
+
+    return script
+
+
+@dataclass
+class Report:
+    """The outcome of a differential run."""
+
+    runs: int = 0
+    reference_seconds: float = 0.0
+    candidate_seconds: float = 0.0
+    failures: list[Script] = field(default_factory=list)
+
+    @property
+    def speed_ratio(self) -> float:
+        """How many times faster the candidate is than the reference."""
+        if self.candidate_seconds == 0:
+            return math.inf
+        return self.reference_seconds / self.candidate_seconds
+
+
+def compare(
+    reference: Engine,
+    candidate: Engine,
+    runs: int = 100,
+    seed: int = 0,
+    max_size: int = 24,
+    length: int = 20,
+) -> Report:
+    """Run random scripts against both engines and shrink any mismatch."""
+    rng = random.Random(seed)
+    report = Report()
+
+    def fails(script: Script) -> bool:
+        try:
+            return reference(script) != candidate(script)
+        except Exception:
+            return True
+
+    for _ in range(runs):
+        script = generate_script(rng, max_size=max_size, length=length)
+
+        start = time.perf_counter()
+        expected = reference(script)
+        report.reference_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            actual = candidate(script)
+        except Exception:
+            actual = None
+        report.candidate_seconds += time.perf_counter() - start
+
+        report.runs += 1
+        if actual != expected:
+            report.failures.append(shrink(script, fails))
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from rle_screen import RunLengthScreen
+    from screen import Screen
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-size", type=int, default=64)
+    args = parser.parse_args()
+
+    candidates = {
+        "screen": application_engine(Screen),
+        "rle": application_engine(RunLengthScreen),
+        "screen+index": application_engine(Screen, region_index=True),
+        "rle+index": application_engine(RunLengthScreen, region_index=True),
+        "screen+fill_limit": application_engine(Screen, fill_limit=2),
+    }
+    for name, candidate in candidates.items():
+        report = compare(
+            reference_engine,
+            candidate,
+            runs=args.runs,
+            seed=args.seed,
+            max_size=args.max_size,
+        )
+        print(
+            f"{name}: {report.runs} runs, {len(report.failures)} failures,"
+            f" {report.speed_ratio:.2f}x the speed of the reference"
+        )
+        for script in report.failures:
+            print("  " + " ; ".join(script))
@@ -0,0 +1,39 @@
+import unittest
+
+from canvas import Canvas
+from exceptions import CanvasException
+from shapes import Line, Point
+
+
+class TestCanvas(unittest.TestCase):
+    def test_given_shapes_and_a_fill_then_the_bytes_match_the_drawing(self):
+        canvas = Canvas.blank(5, 3)
+        canvas.rectangle(0, 0, 4, 2)
+        canvas.draw(Line(Point(1, 1), Point(2, 1)), char="-")
+        canvas.fill(3, 1, char="o")
+
+        self.assertEqual(canvas.to_bytes(), b"xxxxx\nx--ox\nxxxxx\n")
+        self.assertEqual(canvas.to_bytes(region=(1, 1, 3, 1)), b"--o\n")
+
+    def test_given_region_index_when_filled_then_the_result_matches_a_plain_fill(
+        self,
+    ):
+        plain = Canvas.blank(6, 4)
+        indexed = Canvas.blank(6, 4, region_index=True)
+        for canvas in (plain, indexed):
+            canvas.line(0, 3, 5, 0)
+            canvas.fill(0, 0, char="a")
+            canvas.fill(5, 3, char="b")
+            canvas.fill(0, 0, char="x")
+
+        self.assertEqual(plain.to_bytes(), indexed.to_bytes())
+
+    def test_given_a_position_off_screen_when_filled_then_a_canvas_exception_is_raised(
+        self,
+    ):
+        canvas = Canvas.blank(3, 3)
+
+        for x, y in ((3, 0), (0, 3), (-1, 0)):
+            with self.subTest(x=x, y=y):
+                with self.assertRaises(CanvasException):
+                    canvas.fill(x, y)
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from application import Application
+from canvas import Canvas
+from diff import (
+    Change,
+    Patch,
+    apply_patch,
+    diff_lines,
+    diff_screens,
+    format_patch,
+    parse_patch,
+)
+from exceptions import CanvasException
+from rle_screen import RunLengthScreen
+from screen import Screen
+
+
+class TestDiff(unittest.TestCase):
+    def test_given_a_changed_snapshot_then_the_patch_turns_old_into_new(self):
+        for screen_type in (Screen, RunLengthScreen):
+            with self.subTest(screen_type=screen_type.__name__):
+                old = screen_type(10, 3)
+                old.fill_span("#", 0, 9, 0)
+                new = old.snapshot()
+                new.put_char("a", 1, 1)
+                new.put_char("b", 4, 1)
+                new.fill_span(" ", 2, 7, 0)
+
+                patch = diff_screens(old, new)
+
+                self.assertEqual(
+                    patch.changes,
+                    [Change(0, 2, "      "), Change(1, 1, "a  b")],
+                )
+                self.assertEqual(list(apply_patch(old, patch).rows()), list(new.rows()))
+
+    def test_given_mostly_equal_screens_then_only_changed_rows_are_compared(self):
+        old = Screen(200, 200)
+        new = old.snapshot()
+        new.put_char("x", 5, 7)
+        new.put_char("x", 190, 150)
+
+        with mock.patch.object(Screen, "cells", autospec=True) as cells:
+            cells.side_effect = lambda screen, y: list(screen.row(y))
+            patch = diff_screens(old, new)
+
+        self.assertEqual(patch.changes, [Change(7, 5, "x"), Change(150, 190, "x")])
+        compared = {call.args[1] for call in cells.call_args_list}
+        self.assertEqual(sorted(compared), [7, 150])
+
+    def test_given_a_patch_then_its_text_form_round_trips(self):
+        patch = Patch(
+            (3, 2),
+            (4, 2),
+            [Change(0, 1, " \U0001f44d "), Change(1, 0, "x y")],
+        )
+
+        self.assertEqual(parse_patch(format_patch(patch)), patch)
+
+    def test_given_drawings_of_different_sizes_then_the_patch_resizes(self):
+        old = ["abc", "def"]
+        new = ["abcd", "dXf ", "  g "]
+
+        patch = diff_lines(old, new)
+        screen = Screen(3, 2)
+        for y, line in enumerate(old):
+            for x, c in enumerate(line):
+                screen.put_char(c, x, y)
+
+        self.assertEqual(list(apply_patch(screen, patch).rows()), new)
+
+    def test_given_a_patch_for_another_size_then_a_canvas_exception_is_raised(self):
+        with self.assertRaises(CanvasException):
+            apply_patch(Screen(2, 2), Patch((3, 3), (3, 3)))
+
+    def test_given_diff_and_patch_commands_then_the_drawing_is_reproduced(self):
+        with tempfile.TemporaryDirectory() as directory:
+            old_path = Path(directory) / "old.txt"
+            patch_path = Path(directory) / "changes.patch"
+            app = Application(Canvas.blank(6, 4), output=lambda *_: None)
+            app.canvas.rectangle(0, 0, 5, 3)
+            app.canvas.save(old_path)
+            app.canvas.fill(2, 2, char="o")
+
+            app.handle_command(app.parse_command(f"DIFF {old_path} {patch_path}"))
+            other = Application(Canvas.blank(1, 1), output=lambda *_: None)
+            other.handle_command(app.parse_command(f"LOAD {old_path}"))
+            other.handle_command(app.parse_command(f"PATCH {patch_path}"))
+
+            self.assertEqual(len(patch_path.read_text().splitlines()), 4)
+
+        self.assertEqual(list(other.canvas.lines()), list(app.canvas.lines()))
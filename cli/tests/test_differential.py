@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from rle_screen import RunLengthScreen
+from screen import Screen
+from tests.differential import (
+    application_engine,
+    compare,
+    generate_script,
+    reference_engine,
+    shrink,
+)
+
+
+class TestDifferential(unittest.TestCase):
+    def test_given_random_scripts_then_every_engine_matches_the_reference(self):
+        candidates = {
+            "screen": application_engine(Screen),
+            "rle": application_engine(RunLengthScreen),
+            "screen+index": application_engine(Screen, region_index=True),
+            "rle+index": application_engine(RunLengthScreen, region_index=True),
+            "screen+fill_limit": application_engine(Screen, fill_limit=2),
+        }
+
+        for name, candidate in candidates.items():
+            with self.subTest(engine=name):
+                report = compare(reference_engine, candidate, runs=60, seed=35)
+
+                self.assertEqual(report.failures, [])
+                self.assertEqual(report.runs, 60)
+                self.assertGreater(report.speed_ratio, 0)
+
+    def test_given_a_broken_engine_then_the_failing_script_is_shrunk(self):
+        def ignores_fill(script):
+            return reference_engine([c for c in script if not c.startswith("FILL")])
+
+        report = compare(reference_engine, ignores_fill, runs=20, seed=1)
+
+        self.assertTrue(report.failures)
+        for script in report.failures:
+            with self.subTest(script=script):
+                self.assertEqual(len(script), 2)
+                self.assertTrue(script[0].startswith("NEW"))
+                self.assertTrue(script[1].startswith("FILL"))
+
+    def test_given_a_failing_predicate_then_shrinking_keeps_a_valid_script(self):
+        script = generate_script(random.Random(3), length=30)
+
+        shrunk = shrink(script, lambda s: any(c.startswith("FILL") for c in s))
+
+        self.assertEqual(shrunk, ["NEW 1 1", "FILL 0 0"])
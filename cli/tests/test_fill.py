@@ -0,0 +1,142 @@
+import random
+import unittest
+from unittest import mock
+
+from canvas import Canvas
+from exceptions import CanvasException
+from fill import FILL_LIMIT
+from rle_screen import RunLengthScreen
+from screen import Screen
+
+
+def maze(
+    screen_type: type, w: int, h: int, seed: int, region_index: bool = False
+) -> Canvas:
+    """A canvas scattered with walls, some of them drawn in the fill character."""
+    rng = random.Random(seed)
+    canvas = Canvas.blank(w, h, screen_type=screen_type, region_index=region_index)
+    for _ in range(w * h // 3):
+        canvas.screen.put_char(rng.choice("#o"), rng.randrange(w), rng.randrange(h))
+    canvas.screen.put_char(" ", 0, 0)
+    return canvas
+
+
+class TestFill(unittest.TestCase):
+    def test_given_a_large_open_area_then_it_is_filled_without_recursing(self):
+        canvas = Canvas.blank(300, 300)
+
+        filled = canvas.fill(150, 150, char="o")
+
+        self.assertEqual(filled, 300 * 300)
+        self.assertEqual(set(canvas.lines()), {"o" * 300})
+
+    def test_given_a_small_fill_limit_then_the_result_is_the_same(self):
+        for screen_type in (Screen, RunLengthScreen):
+            with self.subTest(screen_type=screen_type.__name__):
+                unlimited = maze(screen_type, 40, 30, seed=39)
+                limited = maze(screen_type, 40, 30, seed=39)
+                limited.fill_limit = 1
+
+                filled = unlimited.fill(0, 0, char="o")
+
+                self.assertEqual(limited.fill(0, 0, char="o"), filled)
+                self.assertEqual(list(limited.lines()), list(unlimited.lines()))
+
+    def test_given_cells_of_the_fill_character_then_only_the_area_is_filled(self):
+        canvas = Canvas.blank(5, 1)
+        canvas.line(2, 0, 2, 0, char="o")
+
+        self.assertEqual(canvas.fill(0, 0, char="o"), 2)
+        self.assertEqual(list(canvas.lines()), ["ooo  "])
+
+    def test_given_private_use_characters_then_they_are_left_alone(self):
+        pua = "\uf8ff"
+        for limit in (FILL_LIMIT, 1):
+            with self.subTest(limit=limit):
+                canvas = Canvas.blank(5, 3, fill_limit=limit)
+                canvas.rectangle(0, 0, 2, 2, char=pua)
+                canvas.line(3, 0, 3, 2, char="#")
+                canvas.line(4, 1, 4, 1, char=pua)
+
+                self.assertEqual(canvas.fill(1, 1, char="o"), 1)
+                self.assertEqual(
+                    list(canvas.lines()),
+                    [pua * 3 + "# ", pua + "o" + pua + "#" + pua, pua * 3 + "# "],
+                )
+
+    @mock.patch("fill.SPANS_PER_BATCH", 1)
+    @mock.patch("fill.PROGRESS_INTERVAL", 0)
+    @mock.patch("regions.RUNS_PER_BATCH", 1)
+    @mock.patch("regions.PROGRESS_INTERVAL", 0)
+    def test_given_a_progress_callback_then_progress_is_reported(self):
+        for region_index in (False, True):
+            with self.subTest(region_index=region_index):
+                canvas = Canvas.blank(3, 4, region_index=region_index)
+                reports = []
+
+                canvas.fill(0, 0, progress=reports.append)
+
+                self.assertTrue(reports)
+                self.assertEqual(reports, sorted(reports))
+                self.assertLessEqual(reports[-1], 12)
+
+    @mock.patch("fill.SPANS_PER_BATCH", 1)
+    @mock.patch("fill.PROGRESS_INTERVAL", 0)
+    @mock.patch("regions.RUNS_PER_BATCH", 1)
+    @mock.patch("regions.PROGRESS_INTERVAL", 0)
+    def test_given_an_interrupted_fill_then_it_is_undone_without_a_snapshot(self):
+        cases = [
+            (screen_type, region_index)
+            for screen_type in (Screen, RunLengthScreen)
+            for region_index in (False, True)
+        ]
+        for screen_type, region_index in cases:
+            with self.subTest(
+                screen_type=screen_type.__name__, region_index=region_index
+            ):
+                canvas = Canvas.blank(
+                    30,
+                    30,
+                    screen_type=screen_type,
+                    region_index=region_index,
+                    fill_limit=1,
+                )
+                canvas.rectangle(5, 5, 20, 20, char="#")
+                canvas.line(0, 12, 4, 12, char="o")
+                before = list(canvas.lines())
+                reports = []
+
+                def interrupt(filled: int):
+                    reports.append(filled)
+                    if len(reports) == 5:
+                        raise KeyboardInterrupt
+
+                with mock.patch.object(screen_type, "snapshot") as snapshot:
+                    with self.assertRaises(CanvasException):
+                        canvas.fill(0, 0, char="o", progress=interrupt)
+
+                snapshot.assert_not_called()
+                self.assertGreater(reports[-1], 0)
+                self.assertEqual(list(canvas.lines()), before)
+
+    @mock.patch("fill.SPANS_PER_BATCH", 1)
+    @mock.patch("fill.PROGRESS_INTERVAL", 0)
+    @mock.patch("regions.RUNS_PER_BATCH", 1)
+    @mock.patch("regions.PROGRESS_INTERVAL", 0)
+    def test_given_a_keyboard_interrupt_then_the_fill_is_rolled_back(self):
+        for region_index in (False, True):
+            with self.subTest(region_index=region_index):
+                canvas = maze(Screen, 20, 20, seed=1, region_index=region_index)
+                before = list(canvas.lines())
+                size = canvas.region_size(0, 0)
+
+                def interrupt(filled: int):
+                    raise KeyboardInterrupt
+
+                with self.assertRaises(CanvasException):
+                    canvas.fill(0, 0, char="o", progress=interrupt)
+
+                self.assertEqual(list(canvas.lines()), before)
+                self.assertEqual(canvas.region_size(0, 0), size)
+                self.assertEqual(canvas.fill(0, 0, char="o"), size)
+                self.assertNotEqual(list(canvas.lines()), before)
@@ -0,0 +1,104 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from application import Application
+from canvas import Canvas
+from glyphs import GLYPHS, display_width, graphemes
+from rle_screen import RunLengthScreen
+from screen import Screen
+
+
+class TestGraphemes(unittest.TestCase):
+    def test_given_multi_code_point_characters_then_they_are_kept_whole(self):
+        cases = {
+            "ab": ["a", "b"],
+            "éx": ["é", "x"],
+            "\U0001f44d\U0001f3fd": ["\U0001f44d\U0001f3fd"],
+            "\U0001f468\u200d\U0001f469\u200d\U0001f467": [
+                "\U0001f468\u200d\U0001f469\u200d\U0001f467"
+            ],
+            "\U0001f1f8\U0001f1ea\U0001f1f3\U0001f1f4": [
+                "\U0001f1f8\U0001f1ea",
+                "\U0001f1f3\U0001f1f4",
+            ],
+            "❤\ufe0f.": ["❤\ufe0f", "."],
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(graphemes(text), expected)
+
+    def test_given_glyphs_then_their_display_width_is_known(self):
+        cases = {"a": 1, "é": 1, "漢": 2, "\U0001f44d": 2, "❤\ufe0f": 2}
+        for glyph, width in cases.items():
+            with self.subTest(glyph=glyph):
+                self.assertEqual(display_width(glyph), width)
+                self.assertEqual(GLYPHS.width(glyph), width)
+
+    def test_given_the_same_glyph_twice_then_it_is_interned_once(self):
+        self.assertEqual(GLYPHS.intern("\U0001f44d"), GLYPHS.intern("\U0001f44d"))
+
+    def test_given_ascii_then_glyph_ids_are_code_points(self):
+        for c in " x~":
+            with self.subTest(c=c):
+                self.assertEqual(GLYPHS.intern(c), ord(c))
+
+
+class TestWideCells(unittest.TestCase):
+    def test_given_a_grapheme_for_cha_then_the_whole_grapheme_is_drawn(self):
+        app = Application(Canvas.blank(3, 1), output=lambda *_: None)
+        for command in ("CHA \U0001f44d\U0001f3fdx", "LIN 0 0 1 0"):
+            app.handle_command(app.parse_command(command))
+
+        self.assertEqual(app.screen.cells(0), ["\U0001f44d\U0001f3fd"] * 2 + [" "])
+
+    def test_given_screens_then_glyphs_round_trip_through_cells_and_rows(self):
+        for screen_type in (Screen, RunLengthScreen):
+            with self.subTest(screen_type=screen_type.__name__):
+                screen = screen_type(3, 1)
+                screen.put_char("é", 0, 0)
+                screen.fill_span("漢", 1, 2, 0)
+
+                self.assertEqual(screen.cells(0), ["é", "漢", "漢"])
+                self.assertEqual(screen.row(0), "é漢漢")
+                self.assertEqual(screen.get_char(0, 0), "é")
+
+    def test_given_wide_glyphs_when_printed_then_every_line_has_the_same_width(self):
+        lines = []
+        app = Application(Canvas.blank(3, 2), output=lines.append)
+        app.canvas.line(0, 0, 1, 0, char="\U0001f44d")
+        app.canvas.line(0, 1, 0, 1, char="é")
+
+        app.print_screen()
+
+        widths = {
+            sum(display_width(g) for g in graphemes(line.rstrip("0123456789 ")))
+            for line in lines
+        }
+        self.assertEqual(len(widths), 1)
+        self.assertIn("║\U0001f44d│\U0001f44d│  ║ 0", lines)
+
+    def test_given_a_file_with_graphemes_when_loaded_then_columns_are_graphemes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "map.txt"
+            path.write_text("é\U0001f44d.\n...\n")
+            canvas = Canvas.blank(1, 1)
+
+            canvas.load(path)
+            canvas.paste(path, 1, 1)
+
+        self.assertEqual((canvas.w, canvas.h), (3, 2))
+        self.assertEqual(canvas.screen.cells(1), [".", "é", "\U0001f44d"])
+
+    def test_given_too_many_characters_when_loaded_then_the_reason_is_shown(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "map.txt"
+            path.write_text("\U0001f9ea\n")
+            lines = []
+            app = Application(Canvas.blank(1, 1), output=lines.append)
+
+            with mock.patch("glyphs.MAX_GLYPHS", len(GLYPHS.glyphs)):
+                app.load(str(path))
+
+        self.assertEqual(lines, ["Too many different characters.  Abort."])
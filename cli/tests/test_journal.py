@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from application import Application
+from canvas import Canvas
+from journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def start(self, **kwargs) -> Application:
+        app = Application(Canvas.blank(1, 1), output=lambda *_: None)
+        app.start_journal(Journal(self.directory, **kwargs))
+        return app
+
+    def run_commands(self, app: Application, *commands: str):
+        for command in commands:
+            app.handle_command(app.parse_command(command))
+
+    def test_given_a_crash_after_a_sync_then_the_drawing_is_recovered(self):
+        app = self.start(sync_every=1)
+        self.run_commands(app, "NEW 5 3", "REC 0 0 4 2", "CHA o", "FILL 2 1")
+        expected = list(app.canvas.lines())
+
+        recovered = self.start()
+
+        self.assertEqual(list(recovered.canvas.lines()), expected)
+        self.assertEqual(recovered.char, "o")
+
+    def test_given_many_commands_then_only_those_after_the_checkpoint_are_replayed(
+        self,
+    ):
+        app = self.start(checkpoint_every=3, sync_every=1)
+        self.run_commands(app, "NEW 4 5", *(f"LIN 0 {y} 3 {y}" for y in range(5)))
+        self.run_commands(app, "HELP", "REGION", "CHA o", "FILL 0 0")
+
+        log = (self.directory / "commands.log").read_text().splitlines()
+        self.assertEqual([line.split("\t")[1] for line in log], ["CHA o", "FILL 0 0"])
+
+        recovered = self.start()
+
+        self.assertEqual(list(recovered.canvas.lines()), ["oooo"] * 5)
+
+    def test_given_layers_then_they_are_restored_from_the_checkpoint(self):
+        app = self.start(checkpoint_every=1)
+        self.run_commands(
+            app,
+            "NEW 3 1",
+            "LIN 0 0 2 0",
+            "LAYER ADD top",
+            "CHA o",
+            "LIN 1 0 1 0",
+            "LAYER ADD hidden",
+            "LAYER HIDE hidden",
+            "LAYER USE top",
+        )
+
+        layers = self.start().canvas.layers
+
+        self.assertEqual(list(layers.layers), ["background", "top", "hidden"])
+        self.assertEqual(layers.active, "top")
+        self.assertEqual(layers.hidden, {"hidden"})
+        self.assertEqual(list(layers.composite().rows()), ["xox"])
+
+    def test_given_a_partly_written_last_line_then_it_is_ignored(self):
+        app = self.start(sync_every=1)
+        self.run_commands(app, "NEW 3 1", "LIN 0 0 0 0")
+        app.journal.close()
+        with (self.directory / "commands.log").open("a") as f:
+            f.write("9\tLIN 0 0 2")
+
+        recovered = self.start()
+
+        self.assertEqual(list(recovered.canvas.lines()), ["x  "])
+
+    def test_given_an_open_journal_then_every_command_is_already_in_the_log(self):
+        app = self.start()
+        self.run_commands(app, "NEW 3 1", "LIN 0 0 0 0", "CHA o", "LIN 2 0 2 0")
+
+        log = (self.directory / "commands.log").read_text().splitlines()
+        recovered = self.start()
+
+        self.assertEqual(len(log), 4)
+        self.assertEqual(list(recovered.canvas.lines()), ["x o"])
@@ -0,0 +1,54 @@
+import unittest
+
+from exceptions import LayerException
+from layers import LayerStack
+from screen import Screen
+
+
+class TestScreenSnapshot(unittest.TestCase):
+    def test_given_a_snapshot_when_either_screen_is_drawn_to_then_the_other_is_unchanged(
+        self,
+    ):
+        screen = Screen(4, 3)
+        screen.put_char("a", 0, 0)
+        snapshot = screen.snapshot()
+
+        screen.put_char("b", 1, 1)
+        snapshot.put_char("c", 2, 2)
+
+        self.assertEqual(list(screen.rows()), ["a   ", " b  ", "    "])
+        self.assertEqual(list(snapshot.rows()), ["a   ", "    ", "  c "])
+
+    def test_given_a_snapshot_then_only_changed_rows_are_copied(self):
+        screen = Screen(4, 3)
+        snapshot = screen.snapshot()
+
+        snapshot.put_char("x", 0, 1)
+
+        self.assertIs(snapshot.buffer[0], screen.buffer[0])
+        self.assertIsNot(snapshot.buffer[1], screen.buffer[1])
+        self.assertIs(snapshot.buffer[2], screen.buffer[2])
+
+
+class TestLayerStack(unittest.TestCase):
+    def test_given_layers_when_composited_then_upper_layers_cover_lower_ones(self):
+        background = Screen(3, 1)
+        for x in range(3):
+            background.put_char(".", x, 0)
+        layers = LayerStack(background)
+        layers.add("overlay").put_char("x", 1, 0)
+
+        self.assertEqual(list(layers.composite().rows()), [".x."])
+
+        layers.set_visible("overlay", False)
+
+        self.assertEqual(list(layers.composite().rows()), ["..."])
+
+    def test_given_a_missing_layer_when_used_then_a_layer_exception_is_raised(self):
+        layers = LayerStack(Screen(3, 1))
+
+        with self.assertRaises(LayerException):
+            layers.use("terrain")
+
+        with self.assertRaises(LayerException):
+            layers.remove("background")
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import unittest
+from multiprocessing import shared_memory
+
+from application import Application
+from canvas import Canvas
+from exceptions import CanvasException
+from live import HEADER, MAGIC, STATE_CLOSED, STATE_OPEN, LivePublisher
+from screen import Screen
+
+
+class TestLivePublisher(unittest.TestCase):
+    def setUp(self):
+        self.publisher = LivePublisher(f"td_test_{os.getpid()}")
+        self.addCleanup(self.publisher.close)
+
+    def read(self) -> tuple[int, int, int, int, bytes]:
+        shm = shared_memory.SharedMemory(self.publisher.name)
+        try:
+            magic, state, version, w, h, _ = HEADER.unpack_from(shm.buf)
+            self.assertEqual(magic, MAGIC)
+            cells = bytes(shm.buf[HEADER.size : HEADER.size + w * h])
+        finally:
+            shm.close()
+        return state, version, w, h, cells
+
+    def test_given_a_published_screen_then_readers_see_its_cells(self):
+        screen = Screen(3, 2)
+        screen.put_char("x", 1, 1)
+
+        self.publisher.publish(screen)
+
+        state, version, w, h, cells = self.read()
+        self.assertEqual((w, h), (3, 2))
+        self.assertEqual(cells, b"    x ")
+        self.assertEqual(version % 2, 0)
+
+    def test_given_no_changes_then_the_version_is_unchanged(self):
+        screen = Screen(3, 2)
+        self.publisher.publish(screen)
+        _, version, *_ = self.read()
+
+        self.publisher.publish(screen)
+        self.assertEqual(self.read()[1], version)
+
+        screen.put_char("o", 0, 0)
+        self.publisher.publish(screen)
+        self.assertEqual(self.read()[1], version + 2)
+        self.assertEqual(self.read()[4], b"o     ")
+
+    def test_given_a_resized_screen_then_the_old_block_is_marked_closed(self):
+        self.publisher.publish(Screen(3, 2))
+        old = shared_memory.SharedMemory(self.publisher.name)
+        self.addCleanup(old.close)
+
+        self.publisher.publish(Screen(4, 4))
+
+        self.assertEqual(HEADER.unpack_from(old.buf)[1], STATE_CLOSED)
+        self.assertEqual(self.read()[2:4], (4, 4))
+
+    def test_given_a_block_in_use_then_a_second_publisher_is_refused(self):
+        self.publisher.publish(Screen(3, 2))
+        other = LivePublisher(self.publisher.name)
+
+        with self.assertRaises(CanvasException):
+            other.publish(Screen(3, 2))
+
+        state, _, w, h, _ = self.read()
+        self.assertEqual((state, w, h), (STATE_OPEN, 3, 2))
+
+    def test_given_a_block_left_by_a_dead_process_then_it_is_replaced(self):
+        dead = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        pid = int(dead.stdout)
+        stale = shared_memory.SharedMemory(
+            self.publisher.name, create=True, size=HEADER.size + 1
+        )
+        HEADER.pack_into(stale.buf, 0, MAGIC, STATE_OPEN, 2, 1, 1, pid)
+        stale.close()
+
+        self.publisher.publish(Screen(2, 2))
+
+        self.assertEqual(self.read()[2:4], (2, 2))
+
+    def test_given_a_name_in_use_then_the_cli_stops_publishing(self):
+        self.publisher.publish(Screen(3, 2))
+        app = Application(
+            Canvas.blank(3, 2), output=lambda *_: None, live_name=self.publisher.name
+        )
+
+        app.publish_live()
+
+        self.assertIsNone(app.live_name)
+        self.assertIn("already published", app.error_message)
+        self.assertEqual(self.read()[0], STATE_OPEN)
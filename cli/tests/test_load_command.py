@@ -0,0 +1,36 @@
+import unittest
+
+from command import LoadCommand, RawCommand
+from exceptions import InvalidCommandException
+
+
+class TestLoadCommand(unittest.TestCase):
+    def test_given_valid_load_command_then_a_load_command_is_returned(self):
+        commands = [
+            ("LOAD map.txt", LoadCommand("map.txt")),
+            ("LOAD map.txt AT 1 2", LoadCommand("map.txt", x=1, y=2)),
+            ("LOAD map.txt at 0 0", LoadCommand("map.txt", x=0, y=0)),
+        ]
+
+        for command, expected in commands:
+            with self.subTest(command=command):
+                raw_command = RawCommand.from_str(command)
+                self.assertEqual(LoadCommand.from_raw_command(raw_command), expected)
+
+    def test_given_a_partial_position_then_an_invalid_command_exception_is_raised(
+        self,
+    ):
+        invalid_commands = [
+            "LOAD map.txt AT",
+            "LOAD map.txt AT 1",
+            "LOAD map.txt 1 2",
+            "LOAD map.txt AT 1 2 3",
+            "LOAD map.txt AT x y",
+            "LOAD map.txt TO 1 2",
+        ]
+
+        for command in invalid_commands:
+            with self.subTest(command=command):
+                raw_command = RawCommand.from_str(command)
+                with self.assertRaises(InvalidCommandException):
+                    LoadCommand.from_raw_command(raw_command)
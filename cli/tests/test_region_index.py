@@ -0,0 +1,140 @@
+import random
+import time
+import unittest
+from collections import deque
+from unittest import mock
+
+from canvas import Canvas
+from regions import RegionIndex
+from rle_screen import RunLengthScreen
+from screen import Screen, ScreenProtocol
+
+
+def region_cells(screen: ScreenProtocol, x: int, y: int) -> set[tuple[int, int]]:
+    c = screen.get_char(x, y)
+    seen = {(x, y)}
+    queue = deque([(x, y)])
+    while queue:
+        cx, cy = queue.popleft()
+        for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            if (
+                0 <= nx < screen.w
+                and 0 <= ny < screen.h
+                and (nx, ny) not in seen
+                and screen.get_char(nx, ny) == c
+            ):
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return seen
+
+
+def region_size(screen: ScreenProtocol, x: int, y: int) -> int:
+    return len(region_cells(screen, x, y))
+
+
+def region_sizes(screen: ScreenProtocol) -> list[int]:
+    remaining = {(x, y) for y in range(screen.h) for x in range(screen.w)}
+    sizes = []
+    while remaining:
+        region = region_cells(screen, *next(iter(remaining)))
+        remaining -= region
+        sizes.append(len(region))
+    return sorted(sizes, reverse=True)
+
+
+class TestRegionIndex(unittest.TestCase):
+    def test_given_a_blank_screen_when_indexed_then_there_is_one_region(self):
+        index = RegionIndex(Screen(7, 4))
+
+        self.assertEqual(index.sizes(), [28])
+        self.assertEqual(index.size(3, 2), 28)
+
+    def test_given_a_wall_splitting_the_screen_then_both_halves_are_separate_regions(
+        self,
+    ):
+        screen = Screen(5, 3)
+        index = RegionIndex(screen)
+        for y in range(3):
+            screen.put_char("x", 2, y)
+
+        self.assertEqual(index.size(0, 0), 6)
+        self.assertEqual(index.size(4, 2), 6)
+        self.assertEqual(index.size(2, 1), 3)
+
+        screen.put_char(" ", 2, 1)
+
+        self.assertEqual(index.size(0, 0), 13)
+        self.assertEqual(index.size(2, 0), 1)
+
+    def test_given_random_edits_then_region_sizes_match_a_full_rescan(self):
+        for screen_type in (Screen, RunLengthScreen):
+            rng = random.Random(26)
+            screen = screen_type(12, 9)
+            index = RegionIndex(screen)
+
+            for _ in range(400):
+                x, y = rng.randrange(screen.w), rng.randrange(screen.h)
+                c = rng.choice("xo ")
+                roll = rng.random()
+                if roll < 0.2:
+                    index.fill(x, y, c)
+                elif roll < 0.6:
+                    screen.put_char(c, x, y)
+                else:
+                    screen.fill_span(c, x, x + rng.randrange(6), y)
+
+                qx, qy = rng.randrange(screen.w), rng.randrange(screen.h)
+                with self.subTest(screen_type=screen_type.__name__, x=qx, y=qy):
+                    self.assertEqual(index.size(qx, qy), region_size(screen, qx, qy))
+
+            self.assertEqual(index.sizes(), region_sizes(screen))
+
+    def test_given_a_line_across_a_region_then_only_its_runs_are_relabelled(self):
+        screen = Screen(1000, 1000)
+        index = RegionIndex(screen)
+
+        for y in range(screen.h):
+            screen.put_char("#", 500, y)
+
+        with mock.patch.object(Screen, "cells") as cells:
+            self.assertEqual(index.size(0, 0), 500 * 1000)
+            self.assertEqual(index.size(999, 999), 499 * 1000)
+        cells.assert_not_called()
+
+
+def rooms(region_index: bool) -> Canvas:
+    """A canvas with rectangles drawn over it, for repeated fills."""
+    rng = random.Random(5)
+    canvas = Canvas.blank(400, 400, region_index=region_index)
+    for _ in range(60):
+        x, y = rng.randrange(380), rng.randrange(380)
+        w, h = rng.randrange(5, 60), rng.randrange(5, 60)
+        canvas.rectangle(x, y, x + w, y + h, char="#")
+    return canvas
+
+
+class TestIndexedFill(unittest.TestCase):
+    def test_given_repeated_fills_then_the_index_never_reads_cells(self):
+        plain, indexed = rooms(region_index=False), rooms(region_index=True)
+
+        with mock.patch.object(Screen, "get_char") as get_char:
+            with mock.patch.object(Screen, "cells") as cells:
+                for i in range(10):
+                    indexed.fill(0, 0, char="ox"[i % 2])
+        get_char.assert_not_called()
+        cells.assert_not_called()
+
+        for i in range(10):
+            plain.fill(0, 0, char="ox"[i % 2])
+        self.assertEqual(list(indexed.lines()), list(plain.lines()))
+
+    def test_given_repeated_fills_then_the_index_is_faster_than_rescanning(self):
+        timings = {}
+        for region_index in (False, True):
+            canvas = rooms(region_index)
+            start = time.perf_counter()
+            for i in range(10):
+                canvas.fill(0, 0, char="ox"[i % 2])
+            timings[region_index] = time.perf_counter() - start
+
+        self.assertLess(timings[True], timings[False])
@@ -0,0 +1,66 @@
+import random
+import unittest
+
+from canvas import Canvas
+from rle_screen import RunLengthScreen
+from screen import Screen
+
+
+class TestRunLengthScreen(unittest.TestCase):
+    def test_given_a_blank_row_when_a_cell_is_drawn_then_the_row_has_three_runs(self):
+        screen = RunLengthScreen(10, 1)
+
+        screen.put_char("x", 4, 0)
+
+        self.assertEqual(list(screen.runs(0)), [(0, 3, " "), (4, 4, "x"), (5, 9, " ")])
+
+        screen.put_char(" ", 4, 0)
+
+        self.assertEqual(list(screen.runs(0)), [(0, 9, " ")])
+
+    def test_given_random_writes_then_rows_match_a_list_screen(self):
+        rng = random.Random(34)
+        reference = Screen(17, 5)
+        screen = RunLengthScreen(17, 5)
+
+        for _ in range(500):
+            c = rng.choice("ab ")
+            y = rng.randrange(-1, 6)
+            if rng.random() < 0.5:
+                x = rng.randrange(-2, 19)
+                reference.put_char(c, x, y)
+                screen.put_char(c, x, y)
+            else:
+                x1, x2 = sorted((rng.randrange(-3, 20), rng.randrange(-3, 20)))
+                reference.fill_span(c, x1, x2, y)
+                screen.fill_span(c, x1, x2, y)
+
+        self.assertEqual(list(screen.rows()), list(reference.rows()))
+        for y in range(screen.h):
+            runs = list(screen.runs(y))
+            with self.subTest(y=y):
+                self.assertEqual(runs, list(reference.runs(y)))
+
+    def test_given_a_snapshot_when_drawn_to_then_the_original_is_unchanged(self):
+        screen = RunLengthScreen(4, 2)
+        snapshot = screen.snapshot()
+
+        snapshot.fill_rect("x", 0, 0, 3, 0)
+
+        self.assertEqual(list(screen.rows()), ["    ", "    "])
+        self.assertEqual(list(snapshot.rows()), ["xxxx", "    "])
+        self.assertIs(snapshot.raw_row(1), screen.raw_row(1))
+
+    def test_given_a_canvas_then_both_storages_draw_the_same(self):
+        canvases = [
+            Canvas.blank(12, 8, screen_type=Screen),
+            Canvas.blank(12, 8, screen_type=RunLengthScreen),
+        ]
+        for canvas in canvases:
+            canvas.rectangle(1, 1, 10, 6)
+            canvas.line(0, 7, 11, 0, char="/")
+            canvas.fill(3, 3, char="o")
+            canvas.add_layer("overlay")
+            canvas.line(-5, 4, 20, 4, char="-")
+
+        self.assertEqual(canvases[0].to_bytes(), canvases[1].to_bytes())
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+CLI_DIR = Path(__file__).resolve().parents[1]
+
+# Import time budgets in microseconds, on top of the interpreter's own startup.
+# Measured under `-X importtime`: about 6ms for --version and 54ms for
+# `import application`.
+VERSION_IMPORT_BUDGET_US = 20_000
+APPLICATION_IMPORT_BUDGET_US = 80_000
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """Run python with `-X importtime` and collect top level cumulative times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=CLI_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+        if not name.startswith("  "):
+            times.setdefault("<top level>", 0)
+            times["<top level>"] += int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.baseline = import_times("-c", "pass")
+
+    def extra_import_time(self, times: dict[str, int]) -> int:
+        return times["<top level>"] - self.baseline["<top level>"]
+
+    def assertNotImported(self, module: str, times: dict[str, int]):
+        if module not in self.baseline:
+            self.assertNotIn(module, times)
+
+    def test_given_version_flag_then_the_application_is_not_imported(self):
+        times = import_times(str(CLI_DIR), "--version")
+
+        for module in ("application", "command", "dataclasses", "enum", "argparse"):
+            with self.subTest(module=module):
+                self.assertNotImported(module, times)
+
+        self.assertLess(self.extra_import_time(times), VERSION_IMPORT_BUDGET_US)
+
+    def test_given_help_flag_then_the_application_is_not_imported(self):
+        times = import_times(str(CLI_DIR), "--help")
+
+        self.assertNotImported("application", times)
+
+    def test_given_the_application_is_imported_then_optional_features_are_deferred(
+        self,
+    ):
+        times = import_times("-c", "import application")
+
+        for module in ("regions", "writer", "storage", "threading", "pathlib"):
+            with self.subTest(module=module):
+                self.assertNotImported(module, times)
+
+        self.assertLess(self.extra_import_time(times), APPLICATION_IMPORT_BUDGET_US)
@@ -0,0 +1,116 @@
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from screen import Screen
+from storage import read_block, read_lines, write_lines
+from writer import BackgroundWriter
+
+
+class TestReadBlock(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_given_a_fixed_width_file_then_only_the_requested_block_is_returned(self):
+        path = self.directory / "map.txt"
+        write_lines(path, ["abcde", "fghij", "klmno", "pqrst"])
+
+        self.assertEqual(read_block(path, cols=2, rows=2), ["ab", "fg"])
+        self.assertEqual(read_block(path, cols=9, rows=9, col=3, row=2), ["no", "st"])
+        self.assertEqual(read_lines(path), ["abcde", "fghij", "klmno", "pqrst"])
+
+    def test_given_a_file_with_crlf_line_endings_then_they_are_not_columns(self):
+        path = self.directory / "map.txt"
+        path.write_bytes(b"abc\r\ndef\r\nghi\r\n")
+
+        self.assertEqual(read_block(path, cols=9, rows=9), ["abc", "def", "ghi"])
+        self.assertEqual(read_block(path, cols=9, rows=1, col=1, row=2), ["hi"])
+        self.assertEqual(read_block(path, cols=9, rows=9), read_lines(path))
+
+    def test_given_a_file_with_uneven_lines_then_the_block_is_still_correct(self):
+        path = self.directory / "map.txt"
+        path.write_text("abc\nde\nfghij\n")
+
+        self.assertEqual(read_block(path, cols=3, rows=3, col=1), ["bc", "e", "ghi"])
+
+    def test_given_uneven_lines_that_fit_the_stride_then_rows_are_lines(self):
+        path = self.directory / "map.txt"
+        path.write_bytes(b"abcd\na\nbc\n")
+
+        self.assertEqual(read_block(path, cols=9, rows=9), ["abcd", "a", "bc"])
+        self.assertEqual(read_block(path, cols=9, rows=1, row=2), ["bc"])
+
+    def test_given_a_file_with_multibyte_characters_then_columns_are_characters(self):
+        path = self.directory / "map.txt"
+        write_lines(path, ["aé", "éa"])
+
+        self.assertEqual(read_block(path, cols=1, rows=2, col=1), ["é", "a"])
+
+
+class TestWriteLines(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_given_an_existing_file_when_written_then_it_is_replaced(self):
+        path = self.directory / "map.txt"
+        write_lines(path, ["old"])
+
+        write_lines(path, (str(i) for i in range(3000)))
+
+        self.assertEqual(read_lines(path), [str(i) for i in range(3000)])
+        self.assertEqual(list(self.directory.iterdir()), [path])
+
+    def test_given_an_existing_file_when_written_then_its_permissions_are_kept(self):
+        path = self.directory / "map.txt"
+        write_lines(path, ["old"])
+        path.chmod(0o600)
+
+        write_lines(path, ["new"])
+
+        self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o600)
+
+    def test_given_a_symlink_when_written_then_its_target_is_replaced(self):
+        target = self.directory / "map.txt"
+        link = self.directory / "link.txt"
+        write_lines(target, ["old"])
+        link.symlink_to(target)
+
+        write_lines(link, ["new"])
+
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(read_lines(target), ["new"])
+
+    def test_given_a_failing_write_then_the_existing_file_is_untouched(self):
+        path = self.directory / "map.txt"
+        write_lines(path, ["old"])
+
+        def lines():
+            yield "new"
+            raise RuntimeError("crash")
+
+        with self.assertRaises(RuntimeError):
+            write_lines(path, lines())
+
+        self.assertEqual(read_lines(path), ["old"])
+        self.assertEqual(list(self.directory.iterdir()), [path])
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    def test_given_a_snapshot_when_the_screen_changes_then_the_snapshot_is_saved(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "map.txt"
+            screen = Screen(3, 2)
+            snapshot = screen.snapshot()
+            writer = BackgroundWriter()
+
+            writer.submit(path, snapshot.rows())
+            screen.put_char("x", 0, 0)
+            writer.close()
+
+            self.assertEqual(read_lines(path), ["   ", "   "])
+            self.assertEqual(writer.results(), [(path, None)])
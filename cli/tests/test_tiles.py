@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from application import Application
+from canvas import Canvas
+from command import RawCommand, SaveCommand
+from exceptions import CanvasException
+from tiles import HEADER, MAGIC, Tileset, encode_level
+
+TILESET_PATH = Path(__file__).resolve().parents[2] / "resources" / "map_tileset.json"
+
+
+class TestTiles(unittest.TestCase):
+    def setUp(self):
+        self.tileset = Tileset.load(TILESET_PATH)
+
+    def test_given_tiles_keyword_then_save_command_saves_tiles(self):
+        cases = {
+            "SAVE lvl.bin": SaveCommand("lvl.bin"),
+            "SAVE lvl.bin TILES": SaveCommand("lvl.bin", tiles=True),
+            "SAVE lvl.bin 0 0 1 1 tiles": SaveCommand("lvl.bin", (0, 0, 1, 1), True),
+        }
+        for string, expected in cases.items():
+            with self.subTest(string=string):
+                raw_command = RawCommand.from_str(string)
+                self.assertEqual(SaveCommand.from_raw_command(raw_command), expected)
+
+    def test_given_lines_then_the_level_holds_a_header_and_tile_indices(self):
+        data = encode_level(["ab", "é\U0001f44d"], self.tileset)
+
+        magic, columns, rows, w, h, name_length = HEADER.unpack_from(data)
+        name = data[HEADER.size : HEADER.size + name_length]
+        cells = data[HEADER.size + name_length :]
+
+        self.assertEqual((magic, columns, rows, w, h), (MAGIC, 10, 5, 2, 2))
+        self.assertEqual(name, b"map_tileset.json")
+        self.assertEqual(list(cells), [0, 1, 31, 31])
+
+    def test_given_save_with_tiles_then_the_file_is_a_tile_level(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "level.bin"
+            app = Application(
+                Canvas.blank(3, 1),
+                output=lambda *_: None,
+                tileset_path=str(TILESET_PATH),
+            )
+            app.canvas.line(0, 0, 1, 0, char="v")
+
+            app.handle_command(app.parse_command(f"SAVE {path} TILES"))
+
+            data = path.read_bytes()
+
+        self.assertTrue(data.startswith(MAGIC))
+        self.assertEqual(list(data[-3:]), [20, 20, 31])
+
+    def test_given_a_missing_tileset_then_a_canvas_exception_is_raised(self):
+        with self.assertRaises(CanvasException):
+            Tileset.load(TILESET_PATH.with_name("missing.json"))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from exceptions import CanvasException
+from glyphs import graphemes
+
+# Layout of a tile level file, read by `game/level.py`:
+#   magic, tileset columns, tileset rows, width, height, length of the tileset
+#   name, the tileset name in UTF-8, then width * height uint8 tile indices.
+HEADER = struct.Struct("<4sHHIIH")
+MAGIC = b"TDLV"
+MAX_TILES = 256
+
+
+@dataclass
+class Tileset:
+    """How drawing characters map to the tiles of a tileset image.
+
+    params:
+        name: File name of the tileset description, which the game looks up.
+        image: File name of the tileset image.
+        columns: Number of tiles across the image.
+        rows: Number of tiles down the image.
+        default: Tile index for characters without a tile of their own.
+        tiles: Tile index of each character.
+    """
+
+    name: str
+    image: str
+    columns: int
+    rows: int
+    default: int
+    tiles: dict[str, int]
+
+    @classmethod
+    def load(cls, path: Path) -> Tileset:
+        """Read a tileset description from a JSON file."""
+        try:
+            with path.open("r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CanvasException(f"Could not read tileset {path}. {e}") from e
+
+        if data["columns"] * data["rows"] > MAX_TILES:
+            raise CanvasException(f"Tileset {path} has more than {MAX_TILES} tiles.")
+
+        return cls(name=path.name, **data)
+
+    def index(self, c: str) -> int:
+        return self.tiles.get(c, self.default)
+
+    def translation(self) -> bytes:
+        """A `bytes.translate` table from latin-1 characters to tile indices."""
+        return bytes(self.index(chr(code)) for code in range(256))
+
+
+def encode_level(lines: Iterable[str], tileset: Tileset) -> bytes:
+    """Encode the lines of a drawing as a tile level.
+
+    Lines of latin-1 characters are translated to tile indices in one call.
+    Other lines are mapped a grapheme at a time.
+    """
+    table = tileset.translation()
+    rows = []
+    for line in lines:
+        try:
+            rows.append(line.encode("latin-1").translate(table))
+        except UnicodeEncodeError:
+            rows.append(bytes(tileset.index(c) for c in graphemes(line)))
+
+    name = tileset.name.encode()
+    header = HEADER.pack(
+        MAGIC,
+        tileset.columns,
+        tileset.rows,
+        len(rows[0]) if rows else 0,
+        len(rows),
+        len(name),
+    )
+    return header + name + b"".join(rows)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import queue
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from storage import write_lines
+
+
+class BackgroundWriter:
+    """Save drawings to files on a background thread.
+
+    The lines of a drawing are produced on the writer thread, so they must come
+    from a screen that is not drawn to afterwards.  Pass lines from a snapshot
+    so drawing can carry on while the file is written.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue[tuple[Path, Iterable[str]] | None] = queue.Queue()
+        self._results: queue.Queue[tuple[Path, Exception | None]] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="background-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self):
+        while (job := self._queue.get()) is not None:
+            path, lines = job
+            try:
+                write_lines(path, lines)
+            except Exception as e:
+                self._results.put((path, e))
+            else:
+                self._results.put((path, None))
+            finally:
+                self._queue.task_done()
+        self._queue.task_done()
+
+    def submit(self, path: Path, lines: Iterable[str]):
+        """Queue lines to be written to `path`."""
+        self._queue.put((path, lines))
+
+    def results(self) -> list[tuple[Path, Exception | None]]:
+        """Collect the outcome of every write finished since the last call."""
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def wait(self):
+        """Block until every queued write has finished."""
+        self._queue.join()
+
+    def close(self):
+        """Finish the queued writes and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
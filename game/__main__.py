@@ -1,9 +1,12 @@
 import math
 import sys
-from collections import defaultdict
+import time
 from pathlib import Path
 
 import pygame
+from level import Tileset, read_level
+from live import LiveLevel
+from renderer import TileRenderer
 
 
 class LevelNotFound(Exception):
@@ -14,93 +17,47 @@ class LevelIsEmpty(Exception):
     ...
 
 
-char_to_tile_index_map = defaultdict(
-    lambda: 31,  # dirt
-    dict(
-        # brick
-        a=0,
-        b=1,
-        c=1,
-        d=2,
-        e=3,
-        f=4,
-        g=5,
-        h=6,
-        i=7,
-        j=8,
-        k=9,
-        # desert
-        l=10,
-        m=11,
-        n=12,
-        o=13,
-        p=14,
-        q=15,
-        r=16,
-        s=17,
-        t=18,
-        u=19,
-        # Grass
-        v=20,
-        w=21,
-        x=22,
-        y=23,
-        z=24,
-        A=25,
-        B=26,
-        C=27,
-        D=28,
-        E=29,
-        # Mud
-        F=30,
-        G=31,
-        H=32,
-        I=33,
-        J=34,
-        K=35,
-        L=36,
-        M=37,
-        N=38,
-        O=39,
-        # Sand stone
-        P=40,
-        Q=41,
-        R=42,
-        S=43,
-        T=44,
-        U=45,
-        V=46,
-        W=47,
-        X=48,
-        Y=49,
-        Z=50,
-    ),
-)
+TILESET_PATH = Path("./resources/map_tileset.json")
 
 
 if __name__ == "__main__":
     argc = len(sys.argv)
-    filename = sys.argv[1] if argc > 1 else "./resources/demo_lvl.txt"
-
-    path = Path(filename)
-    if not path.is_file():
-        raise LevelNotFound(f"{path} not found.")
-
-    level_data = []
-    with path.open("r") as f:
-        for line in f.readlines():
-            level_data.append([c for c in line.rstrip("\n")])
+    live_level = None
+    tileset = Tileset.load(TILESET_PATH)
+    tile_count_width = tileset.columns
+    tile_count_height = tileset.rows
+    if argc > 2 and sys.argv[1] == "--live":
+        # Render the drawing the CLI publishes with `--live NAME` as it changes.
+        source = sys.argv[2]
+        live_level = LiveLevel(source)
+        print(f"Waiting for the CLI to publish `{source}`.")
+        while live_level.poll() is None:
+            time.sleep(0.1)
+        level_data = [[tileset.index(c) for c in row] for row in live_level.rows]
+    else:
+        filename = sys.argv[1] if argc > 1 else "./resources/demo_lvl.txt"
+
+        path = Path(filename)
+        if not path.is_file():
+            raise LevelNotFound(f"{path} not found.")
+        source = str(path)
+
+        level = read_level(path, tileset)
+        if level.tileset is not None:
+            # Saved with `SAVE <filename> TILES`, naming its tileset and grid.
+            tileset = Tileset.load(TILESET_PATH.parent / level.tileset)
+            tile_count_width = level.columns
+            tile_count_height = level.rows
+        level_data = level.cells
 
     if not level_data:
-        raise LevelIsEmpty(f"Level file {path} did not contain data.")
+        raise LevelIsEmpty(f"Level {source} did not contain data.")
 
     pygame.init()
     screen = pygame.display.set_mode([500, 500])
     screen.convert()
 
-    tile_set = pygame.image.load("./resources/map_tileset.png").convert()
-    tile_count_width = 10
-    tile_count_height = 5
+    tile_set = pygame.image.load(tileset.image).convert()
     tile_width = math.ceil(tile_set.get_width() / tile_count_width)
     tile_height = math.ceil(tile_set.get_height() / tile_count_height)
     tiles: list[pygame.Surface] = []
@@ -124,6 +81,15 @@ if __name__ == "__main__":
     screen = pygame.display.set_mode([screen_width, screen_height])
     screen.convert()
 
+    renderer = TileRenderer(
+        tiles,
+        tile_width,
+        tile_height,
+        level_data,
+    )
+    clock = pygame.time.Clock()
+    tiles_blitted = None
+
     # Run until the user asks to quit
     running = True
     while running:
@@ -132,19 +98,34 @@ if __name__ == "__main__":
             if event.type == pygame.QUIT:
                 running = False
 
-        # Fill the background with white
-        screen.fill((255, 255, 255))
-        for y, line in enumerate(level_data):
-            for x, c in enumerate(line):
-                tile = tiles[char_to_tile_index_map[c]]
-                screen.blit(
-                    tile,
-                    (x * tile_width, y * tile_height),
-                    (0, 0, tile_width, tile_height),
+        if live_level is not None:
+            changes = live_level.poll() or []
+            level_size = (live_level.w, live_level.h)
+            if level_size != (level_tile_count_width, level_tile_count_height):
+                level_tile_count_width, level_tile_count_height = level_size
+                screen_width = tile_width * level_tile_count_width
+                screen_height = tile_height * level_tile_count_height
+                screen = pygame.display.set_mode([screen_width, screen_height])
+                screen.convert()
+                renderer.reset(
+                    [[tileset.index(c) for c in row] for row in live_level.rows]
                 )
 
-        # Flip the display
-        pygame.display.flip()
+            for x, y, c in changes:
+                renderer.set_cell(x, y, tileset.index(c))
+
+        # Only blit and update the tiles that changed since the last frame.
+        dirty_rects = renderer.draw(screen)
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+        if renderer.tiles_blitted != tiles_blitted:
+            tiles_blitted = renderer.tiles_blitted
+            pygame.display.set_caption(f"Tiles blitted last frame: {tiles_blitted}")
+
+        clock.tick(60)
 
     # Done! Time to quit.
+    if live_level is not None:
+        live_level.close()
     pygame.quit()
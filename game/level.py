@@ -0,0 +1,77 @@
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+# Must match the layout written by `cli/tiles.py`.
+HEADER = struct.Struct("<4sHHIIH")
+MAGIC = b"TDLV"
+
+
+@dataclass
+class Tileset:
+    """A tileset image and how level characters map to its tiles.
+
+    params:
+        image: Path of the tileset image.
+        columns: Number of tiles across the image.
+        rows: Number of tiles down the image.
+        default: Tile index for characters without a tile of their own.
+        tiles: Tile index of each character.
+    """
+
+    image: Path
+    columns: int
+    rows: int
+    default: int
+    tiles: dict[str, int]
+
+    @classmethod
+    def load(cls, path: Path) -> "Tileset":
+        """Read a tileset description.  The image is found next to it."""
+        with path.open("r") as f:
+            data = json.load(f)
+        data["image"] = path.parent / data["image"]
+        return cls(**data)
+
+    def index(self, c: str) -> int:
+        return self.tiles.get(c, self.default)
+
+
+@dataclass
+class Level:
+    """Tile indices of a level and the tileset they index into.
+
+    params:
+        tileset: File name of the tileset description, if the level names one.
+        columns: Number of tiles across the tileset image, if the level says.
+        rows: Number of tiles down the tileset image, if the level says.
+        cells: Rows of tile indices.
+    """
+
+    tileset: str | None
+    columns: int | None
+    rows: int | None
+    cells: list[bytes]
+
+
+def read_level(path: Path, tileset: Tileset) -> Level:
+    """Read a level saved by the CLI.
+
+    A level saved with `SAVE <filename> TILES` is read with a single read and
+    already holds tile indices.  A text level is mapped to tile indices with
+    `tileset`, once, as it is read.
+    """
+    data = path.read_bytes()
+    if data.startswith(MAGIC):
+        _, columns, rows, w, h, name_length = HEADER.unpack_from(data)
+        start = HEADER.size + name_length
+        name = data[HEADER.size : start].decode()
+        cells = [data[start + y * w : start + (y + 1) * w] for y in range(h)]
+        return Level(name, columns, rows, cells)
+
+    cells = [
+        bytes(tileset.index(c) for c in line)
+        for line in data.decode().splitlines()
+    ]
+    return Level(None, None, None, cells)
@@ -0,0 +1,90 @@
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+# Must match the layout written by `cli/live.py`.
+HEADER = struct.Struct("<4sIQIII")
+MAGIC = b"TDRW"
+STATE_CLOSED = 1
+
+
+class LiveLevel:
+    """Read a level that the CLI publishes into shared memory.
+
+    params:
+        name: Name of the shared memory block, as given to `cli --live`.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = -1
+        self.w = 0
+        self.h = 0
+        self.rows: list[list[str]] = []
+        self._shm: shared_memory.SharedMemory | None = None
+        self._cells = b""
+
+    def _attach(self) -> bool:
+        try:
+            self._shm = shared_memory.SharedMemory(self.name)
+        except FileNotFoundError:
+            return False
+
+        # The CLI owns the block.  Stop the resource tracker from unlinking it
+        # when the game exits.
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        return True
+
+    def _detach(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def poll(self) -> list[tuple[int, int, str]] | None:
+        """Pick up a new version of the level, if there is one.
+
+        Returns the cells that changed as (x, y, char), or None when nothing
+        changed.  When the level is resized every cell is returned and `w`
+        and `h` are updated.
+        """
+        if self._shm is None and not self._attach():
+            return None
+
+        buf = self._shm.buf
+        magic, state, version, w, h, _ = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            return None
+
+        if state == STATE_CLOSED:
+            self._detach()
+            return None
+
+        if version == self.version or version % 2:
+            return None
+
+        cells = bytes(buf[HEADER.size : HEADER.size + w * h])
+        if HEADER.unpack_from(buf)[2] != version:
+            # Written to while copying.  Try again next frame.
+            return None
+
+        self.version = version
+        resized = (w, h) != (self.w, self.h)
+        if resized:
+            self.w, self.h = w, h
+            self.rows = [[" "] * w for _ in range(h)]
+            self._cells = b""
+
+        changes = []
+        for y in range(h):
+            row = cells[y * w : (y + 1) * w]
+            if not resized and row == self._cells[y * w : (y + 1) * w]:
+                continue
+            for x, c in enumerate(row.decode("latin-1")):
+                if resized or self.rows[y][x] != c:
+                    self.rows[y][x] = c
+                    changes.append((x, y, c))
+
+        self._cells = cells
+        return changes
+
+    def close(self):
+        self._detach()
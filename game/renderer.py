@@ -0,0 +1,63 @@
+from typing import Sequence
+
+import pygame
+
+
+class TileRenderer:
+    """Draw a level as tiles, blitting only the tiles whose cells changed.
+
+    params:
+        tiles: Tile images, indexed by tile index.
+        tile_width: Width of a tile in pixels.
+        tile_height: Height of a tile in pixels.
+        level: Rows of tile indices.  The renderer keeps its own copy, in which
+            every cell starts out dirty.
+    """
+
+    def __init__(
+        self,
+        tiles: list[pygame.Surface],
+        tile_width: int,
+        tile_height: int,
+        level: Sequence[Sequence[int]],
+    ):
+        self.tiles = tiles
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.tiles_blitted = 0
+        self.reset(level)
+
+    def reset(self, level: Sequence[Sequence[int]]):
+        """Replace the level with a copy of `level` and mark every cell dirty."""
+        self.level = [list(line) for line in level]
+        self.dirty: set[tuple[int, int]] = {
+            (x, y) for y, line in enumerate(level) for x in range(len(line))
+        }
+
+    def set_cell(self, x: int, y: int, tile: int):
+        """Change the tile of a cell, marking it dirty if it is different."""
+        if self.level[y][x] != tile:
+            self.level[y][x] = tile
+            self.dirty.add((x, y))
+
+    def draw(self, surface: pygame.Surface) -> list[pygame.Rect]:
+        """Blit the dirty tiles and return the screen areas that changed.
+
+        Dirty tiles next to each other on a row are reported as one rectangle.
+        """
+        rects: list[pygame.Rect] = []
+        self.tiles_blitted = len(self.dirty)
+        last = None
+        for x, y in sorted(self.dirty, key=lambda cell: (cell[1], cell[0])):
+            tile = self.tiles[self.level[y][x]]
+            position = (x * self.tile_width, y * self.tile_height)
+            surface.blit(tile, position, (0, 0, self.tile_width, self.tile_height))
+
+            if last is not None and last == (x - 1, y):
+                rects[-1].width += self.tile_width
+            else:
+                rects.append(pygame.Rect(position, (self.tile_width, self.tile_height)))
+            last = (x, y)
+
+        self.dirty.clear()
+        return rects